@@ -3,18 +3,48 @@ import io
 import zipfile
 import datetime as dt
 import json
+import tempfile
 from urllib.parse import urlencode, parse_qs
-from flask import request, Response
+from flask import request, Response, stream_with_context
 
 import numpy as np
-from scipy.integrate import solve_ivp
+
+from mro import (
+    CHANNELS,
+    MRO_LAB_TEMPLATE,
+    TILE_STORE,
+    cache_stats,
+    curve_indices,
+    decimate_indices,
+    downsample,
+    encode_figures,
+    encode_patch,
+    figure,
+    line,
+    load_grid,
+    payload_stats,
+    simulate,
+    sweep_metric,
+)
+from mro.stream import (
+    SERIES,
+    iter_csv,
+    iter_json,
+    minmax_decimate,
+    spectrum_max_points,
+    stream_max_points,
+    stream_seconds,
+    welch_spectrum,
+    write_csv,
+    write_json,
+)
 
 import dash
-from dash import dcc, html, Input, Output, State, callback
+import diskcache
+from dash import ClientsideFunction, DiskcacheManager, Patch, ctx, dcc, html, Input, Output, State, callback
 from dash.exceptions import PreventUpdate
 
 import plotly.graph_objects as go
-import plotly.express as px
 import plotly.io as pio
 
 
@@ -22,12 +52,6 @@ import plotly.io as pio
 #   Modèle MRO
 # ===========================
 
-def MRO_equations(t, Y, m, gamma, k):
-    x, dxdt = Y
-    dxdtt = -(gamma / m) * dxdt - (k / m) * x
-    return [dxdt, dxdtt]
-
-
 def simulate_mro(
     m=1.0,
     gamma=0.15,
@@ -37,20 +61,23 @@ def simulate_mro(
     t_start=0.0,
     t_end=30.0,
     t_points=3000,
+    backend=None,
+    **options,
 ):
-    t_eval = np.linspace(t_start, t_end, t_points)
-    sol = solve_ivp(
-        MRO_equations,
-        [t_start, t_end],
-        [x0, v0],
-        args=(m, gamma, k),
-        t_eval=t_eval,
-        method="RK45",
+    # Noyau partagé (mro.core) : backend "analytic" par défaut, "numba" ou
+    # "scipy" (RK45 de référence) par appel ou via MRO_BACKEND.
+    return simulate(
+        m=m,
+        gamma=gamma,
+        k=k,
+        x0=x0,
+        v0=v0,
+        t_start=t_start,
+        t_end=t_end,
+        t_points=t_points,
+        backend=backend,
+        **options,
     )
-    t = sol.t
-    x = sol.y[0]
-    v = sol.y[1]
-    return t, x, v
 
 
 def heatmap_max_amp(
@@ -61,22 +88,31 @@ def heatmap_max_amp(
     v0=0.0,
     t_end=30.0,
     t_points=2000,
+    mode="sampled",
 ):
-    data = np.zeros((len(gammas), len(ks)))
-    for i, g in enumerate(gammas):
-        for j, kk in enumerate(ks):
-            t, x, _ = simulate_mro(
-                m=m,
-                gamma=g,
-                k=kk,
-                x0=x0,
-                v0=v0,
-                t_start=0,
-                t_end=t_end,
-                t_points=t_points,
-            )
-            data[i, j] = np.max(np.abs(x))
-    return data
+    # "sampled" : grille entière vectorisée ; "exact" / "table" : sans trajectoire
+    return sweep_metric(
+        gammas,
+        ks,
+        "max_amp",
+        m=m,
+        x0=x0,
+        v0=v0,
+        t_end=t_end,
+        t_points=t_points,
+        mode=mode,
+    )
+
+
+# ===========================
+#   Tâches longues (background callbacks)
+# ===========================
+# Heatmap 3D et export ZIP tournent dans des processus dédiés, suivis via un
+# cache disque local (pas de Redis) : les workers gunicorn restent libres.
+# Dash termine d'office la tâche précédente d'un callback relancé (oldJob).
+
+JOBS_DIR = os.environ.get("MRO_JOBS_DIR", os.path.join(tempfile.gettempdir(), "mro_jobs"))
+BACKGROUND_MANAGER = DiskcacheManager(diskcache.Cache(JOBS_DIR), expire=3600)
 
 
 # ===========================
@@ -87,6 +123,7 @@ app = dash.Dash(
     __name__,
     use_pages=True,
     suppress_callback_exceptions=True,
+    background_callback_manager=BACKGROUND_MANAGER,
     title="Laboratoire Éphévériste • Modèle de Résonance Ontogénétique",
     external_stylesheets=[
         "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css"
@@ -187,6 +224,139 @@ def _favicon():
         content = f.read()
     return content, 200, {"Content-Type": "image/x-icon"}
 
+# ===========================
+#   Exports longs en flux (mémoire constante)
+# ===========================
+
+# Jusqu'à 10⁸ échantillons en mémoire constante (mro.stream). Le CSV / JSON
+# complet est borné par le temps de formatage (stream_max_points) ; au-delà,
+# l'enveloppe min/max et le spectre de Welch explorent l'horizon entier.
+STREAM_MAX_POINTS = 100_000_000
+
+# Paramètres flottants → nom dans l'URL (messages d'erreur)
+STREAM_ARGS = {"m": "m", "gamma": "g", "k": "k", "x0": "x0", "v0": "v0", "t_end": "t"}
+
+
+def _stream_params():
+    def get(name, default, cast=float):
+        try:
+            return cast(request.args.get(name, default))
+        except (TypeError, ValueError):
+            return default
+
+    t_points = min(get("n", 3000, int), STREAM_MAX_POINTS)
+    return dict(
+        m=get("m", 1.0),
+        gamma=get("g", 0.15),
+        k=get("k", 1.0),
+        x0=get("x0", 1.0),
+        v0=get("v0", 0.0),
+        t_end=get("t", 30.0),
+        t_points=t_points,
+    )
+
+
+def _stream_error(params, fmt=None, nperseg=None):
+    # Message d'erreur (400) ou None ; nperseg : spectre de Welch
+    for key, name in STREAM_ARGS.items():
+        if not np.isfinite(params[key]):
+            return f"{name} doit être fini"
+    if params["m"] <= 0:
+        return "m doit être > 0"
+    if params["t_end"] <= 0:
+        return "t doit être > 0"
+    if params["t_points"] < 2:
+        return "n doit être ≥ 2"
+    if fmt is not None and params["t_points"] > stream_max_points(fmt):
+        return (
+            f"n trop grand pour un export {fmt.upper()} : {stream_max_points(fmt)} points au plus "
+            f"(~{stream_seconds():.0f} s de worker). Pour explorer un horizon plus long : "
+            "/export/mro_envelope.json et /export/mro_spectrum.json."
+        )
+    if nperseg is not None and params["t_points"] > spectrum_max_points(nperseg):
+        limit = spectrum_max_points(nperseg)
+        return (
+            f"n trop grand pour un spectre (nperseg={nperseg}) : {limit} points au plus, "
+            f"soit {limit // max(1, nperseg // 2)} segments (~{stream_seconds():.0f} s de worker)."
+        )
+    return None
+
+
+def _bad_request(message):
+    return message, 400, {"Content-Type": "text/plain; charset=utf-8"}
+
+
+@server.route("/export/mro.csv")
+def _export_stream_csv():
+    params = _stream_params()
+    error = _stream_error(params, "csv")
+    if error:
+        return _bad_request(error)
+    return Response(
+        stream_with_context(iter_csv(**params)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=mro_data.csv"},
+    )
+
+
+@server.route("/export/mro.json")
+def _export_stream_json():
+    params = _stream_params()
+    error = _stream_error(params, "json")
+    if error:
+        return _bad_request(error)
+    return Response(
+        stream_with_context(iter_json(**params)),
+        mimetype="application/json",
+        headers={"Content-Disposition": "attachment; filename=mro_data.json"},
+    )
+
+
+@server.route("/export/mro_envelope.json")
+def _export_envelope():
+    # Tracé d'un horizon long : min / max par seau (2 × buckets points),
+    # calculés à la volée sans matérialiser la série
+    params = _stream_params()
+    error = _stream_error(params)
+    if error:
+        return _bad_request(error)
+    series = request.args.get("series", "x")
+    if series not in SERIES or series == "t":
+        return _bad_request(f"series inconnue : {series!r}")
+    try:
+        buckets = min(max(int(request.args.get("buckets", 2000)), 1), 20_000)
+    except ValueError:
+        buckets = 2000
+    t, y = minmax_decimate(**params, n_buckets=buckets, series=series)
+    body = {"params": params, "t": t.tolist(), series: y.tolist()}
+    return Response(json.dumps(body), mimetype="application/json")
+
+
+@server.route("/export/mro_spectrum.json")
+def _export_spectrum():
+    # Spectre de puissance de x(t) accumulé segment par segment (Welch)
+    params = _stream_params()
+    try:
+        nperseg = min(max(int(request.args.get("nperseg", 4096)), 16), 2**20)
+    except ValueError:
+        nperseg = 4096
+    error = _stream_error(params, nperseg=nperseg)
+    if error:
+        return _bad_request(error)
+    freqs, power = welch_spectrum(**params, nperseg=nperseg)
+    body = {"params": params, "freqs": freqs.tolist(), "power": power.tolist()}
+    return Response(json.dumps(body), mimetype="application/json")
+
+@server.route("/_stats/cache")
+def _cache_stats():
+    # Statistiques du cache de résultats de ce worker (hits, misses, octets)
+    return Response(json.dumps(cache_stats()), mimetype="application/json")
+
+@server.route("/_stats/payload")
+def _payload_stats():
+    # Octets des figures : listes décimales vs tableaux typés (MRO_PAYLOAD_STATS=1)
+    return Response(json.dumps(payload_stats()), mimetype="application/json")
+
 # Static assets (explicit, fallback)
 from flask import send_from_directory
 
@@ -319,25 +489,8 @@ app.index_string = """
 #   Plotly theme (scientific, lab-like)
 # ===========================
 
-pio.templates["mro_lab"] = go.layout.Template(
-    layout=go.Layout(
-        font=dict(family="system-ui, -apple-system, BlinkMacSystemFont, 'SF Pro Text', sans-serif", size=14, color="#111827"),
-        paper_bgcolor="#f7f7f8",
-        plot_bgcolor="#ffffff",
-        xaxis=dict(gridcolor="#e5e7eb", zerolinecolor="#e5e7eb", linecolor="#9ca3af", ticks="outside"),
-        yaxis=dict(gridcolor="#e5e7eb", zerolinecolor="#e5e7eb", linecolor="#9ca3af", ticks="outside"),
-        colorway=[
-            "#0d6efd",  # primary
-            "#16a085",
-            "#8e44ad",
-            "#e67e22",
-            "#2c3e50",
-            "#d35400",
-        ],
-        legend=dict(bgcolor="#ffffff", bordercolor="#e5e7eb", borderwidth=1),
-        margin=dict(l=60, r=30, t=50, b=60),
-    )
-)
+# Défini dans mro.figures (partagé avec les figures en dict des callbacks)
+pio.templates["mro_lab"] = go.layout.Template(MRO_LAB_TEMPLATE)
 pio.templates.default = "mro_lab"
 
 
@@ -465,6 +618,8 @@ app.layout = html.Div(
         dcc.Location(id="url", refresh=False),
         # Store global pour la langue (persisté localement)
         dcc.Store(id="lang-store", storage_type="local", data={"lang": "fr"}),
+        # Dernière grille calculée par la page Heatmap 3D (réutilisée par l'export ZIP)
+        dcc.Store(id="last-heatmap", storage_type="session"),
 
         # --- NAVBAR ---
         html.Nav(
@@ -959,6 +1114,7 @@ def update_equation(m, gamma, k):
     Output("phase-space", "figure"),
     Output("energy-graph", "figure"),
     Output("acc-graph", "figure"),
+    Output("core-drawn", "data"),
     Input("m", "value"),
     Input("gamma", "value"),
     Input("k", "value"),
@@ -968,79 +1124,176 @@ def update_equation(m, gamma, k):
     Input("opts", "value"),
     State("ts-annotations", "data"),
     State("ts-shapes", "data"),
+    State("core-drawn", "data"),
 )
-def update_core_plots(m, gamma, k, x0, v0, tend, opts, annotations, shapes):
+def update_core_plots(m, gamma, k, x0, v0, tend, opts, annotations, shapes, drawn):
+    grid = bool(opts and ("grid" in opts))
+    # Graphes vides (premier rendu, retour sur la page) : figures complètes
+    trigger = ctx.triggered_id if drawn else None
+
+    # Quadrillage seul : delta de layout, sans simulation ni données
+    if trigger == "opts":
+        patches = []
+        for _ in range(4):
+            patch = Patch()
+            for axis in ("xaxis", "yaxis"):
+                if grid:
+                    patch["layout"][axis]["showgrid"] = True
+                else:
+                    del patch["layout"][axis]["showgrid"]
+            patches.append(patch)
+        return (*patches, dash.no_update)
+
+    series = _core_series(m, gamma, k, x0, v0, tend)
+    revision = _ts_revision(m, gamma, k, x0, v0, tend)
+
+    # Paramètres modifiés : seules les traces (x, y) changent ; layout,
+    # template et annotations restent ceux déjà affichés
+    if trigger is not None:
+        patches = [Patch() for _ in range(4)]
+        for patch, traces in zip(patches, series):
+            for i, (xx, yy) in enumerate(traces):
+                patch["data"][i]["x"] = xx
+                patch["data"][i]["y"] = yy
+        patches[0]["layout"]["uirevision"] = revision
+        # Formes dessinées : réappliquées, le changement de uirevision les efface
+        if shapes:
+            patches[0]["layout"]["shapes"] = shapes
+        return (*(encode_patch(p, "update_core_plots") for p in patches), dash.no_update)
+
+    (ts,), (ph,), energy, (acc,) = series
+
+    # Figures en dict (mro.figures) : pas de validation graph_objects
+    # --- Série temporelle ---
+    fig_ts = figure(
+        [line(ts[0], ts[1], "x(t)")],
+        "x(t)",
+        "Temps",
+        "Amplitude x(t)",
+        grid,
+        # Zoom conservé tant que les paramètres ne changent pas
+        uirevision=revision,
+        # Annotations texte et formes dessinées
+        annotations=[_ts_annotation(ann) for ann in annotations or []],
+        shapes=shapes or [],
+    )
+
+    # --- Espace des phases ---
+    fig_ph = figure([line(ph[0], ph[1], "Trajectoire")], "Espace des phases", "x", "dx/dt", grid)
+    fig_e = figure(
+        [line(tt, yy, name) for name, (tt, yy) in zip(("E_kin", "E_pot", "E_tot"), energy)],
+        "Énergie du système",
+        "Temps",
+        "Énergie",
+        grid,
+    )
+    fig_a = figure([line(acc[0], acc[1], "a(t)")], "a(t)", "Temps", "Accélération", grid)
+
+    # Tableaux typés (base64, float32) plutôt que listes décimales
+    return (*encode_figures("update_core_plots", fig_ts, fig_ph, fig_e, fig_a), True)
+
+
+def _core_series(m, gamma, k, x0, v0, tend):
+    # Traces (x, y) des quatre graphes, dans l'ordre des figures
     t, x, v = simulate_mro(m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=tend)
     a = -(gamma / m) * v - (k / m) * x
     ek = 0.5 * m * (v ** 2)
     ep = 0.5 * k * (x ** 2)
     et = ek + ep
 
-    # --- Série temporelle ---
-    fig_ts = go.Figure()
-    fig_ts.add_trace(go.Scatter(x=t, y=x, mode="lines", name="x(t)"))
-    fig_ts.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="Amplitude x(t)",
-        title="x(t)",
+    # Environ un point par pixel (LTTB, mro.decimate) ; le zoom sur x(t)
+    # redemande la fenêtre visible (refine_time_series)
+    def lttb(y):
+        idx = decimate_indices(t, y)
+        return t[idx], y[idx]
+
+    idx = curve_indices(x, v)
+    return (
+        [lttb(x)],
+        [(x[idx], v[idx])],
+        [lttb(ek), lttb(ep), lttb(et)],
+        [lttb(a)],
     )
 
-    # Annotations texte (directement sur le graphe)
-    if annotations:
-        for ann in annotations:
-            fig_ts.add_annotation(
-                x=ann["x"],
-                y=ann["y"],
-                text=ann["label"],
-                showarrow=True,
-                arrowhead=2,
-                ax=0,
-                ay=-25,
-                font={"size": 10},
-            )
-
-    # Formes dessinées (shapes)
-    if shapes:
-        fig_ts.update_layout(shapes=shapes)
 
-    # --- Espace des phases ---
-    fig_ph = go.Figure()
-    fig_ph.add_trace(go.Scatter(x=x, y=v, mode="lines", name="Trajectoire"))
-    fig_ph.update_layout(
-        xaxis_title="x",
-        yaxis_title="dx/dt",
-        title="Espace des phases",
-    )
-    fig_e = go.Figure()
-    fig_e.add_trace(go.Scatter(x=t, y=ek, mode="lines", name="E_kin"))
-    fig_e.add_trace(go.Scatter(x=t, y=ep, mode="lines", name="E_pot"))
-    fig_e.add_trace(go.Scatter(x=t, y=et, mode="lines", name="E_tot"))
-    fig_e.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="Énergie",
-        title="Énergie du système",
+def _ts_annotation(ann):
+    return dict(
+        x=ann["x"],
+        y=ann["y"],
+        text=ann["label"],
+        showarrow=True,
+        arrowhead=2,
+        ax=0,
+        ay=-25,
+        font={"size": 10},
     )
 
-    fig_a = go.Figure()
-    fig_a.add_trace(go.Scatter(x=t, y=a, mode="lines", name="a(t)"))
-    fig_a.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="Accélération",
-        title="a(t)",
-    )
 
-    if opts and ("grid" in opts):
-        for fig in (fig_ts, fig_ph, fig_e, fig_a):
-            fig.update_xaxes(showgrid=True)
-            fig.update_yaxes(showgrid=True)
+def _ts_revision(m, gamma, k, x0, v0, tend):
+    return f"{m}|{gamma}|{k}|{x0}|{v0}|{tend}"
+
+
+def _ts_window(relayoutData):
+    # (t0, t1) de la vue zoomée, None après un double-clic (autorange)
+    rng = relayoutData.get("xaxis.range") or [
+        relayoutData.get("xaxis.range[0]"),
+        relayoutData.get("xaxis.range[1]"),
+    ]
+    if None in rng:
+        return None
+    return float(rng[0]), float(rng[1])
+
+
+@callback(
+    Output("time-series", "figure", allow_duplicate=True),
+    Input("time-series", "relayoutData"),
+    State("m", "value"),
+    State("gamma", "value"),
+    State("k", "value"),
+    State("x0", "value"),
+    State("v0", "value"),
+    State("tend", "value"),
+    prevent_initial_call=True,
+)
+def refine_time_series(relayoutData, m, gamma, k, x0, v0, tend):
+    # Fenêtre zoomée renvoyée à pleine résolution depuis la trajectoire en
+    # cache (aucune nouvelle simulation) ; seule la trace x(t) est modifiée
+    if not relayoutData or not any(key.startswith("xaxis.") for key in relayoutData):
+        raise PreventUpdate
+    t, x, v = simulate_mro(m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=tend)
+    idx = decimate_indices(t, x, window=_ts_window(relayoutData))
+    patch = Patch()
+    patch["data"][0]["x"] = t[idx]
+    patch["data"][0]["y"] = x[idx]
+    return encode_patch(patch, "refine_time_series")
+
 
-    return fig_ts, fig_ph, fig_e, fig_a
+# Aperçu pendant le glissement des sliders : solution exacte évaluée dans le
+# navigateur (assets/mro-live.js), aucun aller-retour serveur ; le relâchement
+# (value) déclenche update_core_plots, qui remplace l'aperçu
+app.clientside_callback(
+    ClientsideFunction(namespace="mro", function_name="preview"),
+    Output("time-series", "figure", allow_duplicate=True),
+    Output("phase-space", "figure", allow_duplicate=True),
+    Output("energy-graph", "figure", allow_duplicate=True),
+    Output("acc-graph", "figure", allow_duplicate=True),
+    Input("m", "drag_value"),
+    Input("gamma", "drag_value"),
+    Input("k", "drag_value"),
+    Input("x0", "drag_value"),
+    Input("v0", "drag_value"),
+    Input("tend", "drag_value"),
+    State("opts", "value"),
+    State("core-drawn", "data"),
+    prevent_initial_call=True,
+)
 
 # Annotations
 
 @callback(
     Output("ts-annotations", "data"),
     Output("annot-list", "children"),
+    Output("time-series", "figure", allow_duplicate=True),
     Input("time-series", "clickData"),
     State("annot-label", "value"),
     State("ts-annotations", "data"),
@@ -1059,8 +1312,11 @@ def add_annotation(clickData, label, data):
     if x is None or y is None:
         raise PreventUpdate
 
-    # Ajoute l'annotation
-    data.append({"x": float(x), "y": float(y), "label": label})
+    # Ajoute l'annotation (au store, et au graphe sans le reconstruire)
+    ann = {"x": float(x), "y": float(y), "label": label}
+    data.append(ann)
+    patch = Patch()
+    patch["layout"]["annotations"].append(_ts_annotation(ann))
 
     # Liste lisible sous le graphe
     items = [
@@ -1068,7 +1324,7 @@ def add_annotation(clickData, label, data):
         for i, ann in enumerate(data)
     ]
 
-    return data, items
+    return data, items, patch
 
 # Callback des dessins
 
@@ -1092,6 +1348,10 @@ def sync_drawn_shapes(relayoutData):
 #   Export ZIP helpers
 # ===========================
 
+# Points par axe de la heatmap exportée (au-delà : moyenne par blocs, mro.raster)
+EXPORT_HEATMAP_SIDE = 600
+
+
 def _build_core_figs(
     m,
     gamma,
@@ -1106,6 +1366,8 @@ def _build_core_figs(
     heat_kmin,
     heat_kmax,
     heat_kstep,
+    heat_mode="exact",
+    heat_view=None,
 ):
     t, x, v = simulate_mro(m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=tend)
     a = -(gamma / m) * v - (k / m) * x
@@ -1113,62 +1375,53 @@ def _build_core_figs(
     ep = 0.5 * k * (x ** 2)
     et = ek + ep
 
-    fig_ts = go.Figure()
-    fig_ts.add_trace(go.Scatter(x=t, y=x, mode="lines", name="x(t)"))
-    fig_ts.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="Amplitude x(t)",
-        title="x(t)",
-    )
-
-    fig_ph = go.Figure()
-    fig_ph.add_trace(go.Scatter(x=x, y=v, mode="lines", name="Trajectoire"))
-    fig_ph.update_layout(
-        xaxis_title="x",
-        yaxis_title="dx/dt",
-        title="Espace des phases",
-    )
-
-    fig_e = go.Figure()
-    fig_e.add_trace(go.Scatter(x=t, y=ek, mode="lines", name="E_kin"))
-    fig_e.add_trace(go.Scatter(x=t, y=ep, mode="lines", name="E_pot"))
-    fig_e.add_trace(go.Scatter(x=t, y=et, mode="lines", name="E_tot"))
-    fig_e.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="Énergie",
-        title="Énergie du système",
-    )
-
-    fig_a = go.Figure()
-    fig_a.add_trace(go.Scatter(x=t, y=a, mode="lines", name="a(t)"))
-    fig_a.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="Accélération",
-        title="a(t)",
-    )
-
-    gammas = np.arange(float(heat_gmin), float(heat_gmax) + 1e-9, float(heat_gstep))
-    ks = np.arange(float(heat_kmin), float(heat_kmax) + 1e-9, float(heat_kstep))
-    Z = heatmap_max_amp(
-        gammas,
-        ks,
-        m=1.0,
-        x0=1.0,
-        v0=0.0,
-        t_end=float(tend),
-        t_points=800,
+    # Figures en dict, pleine résolution ; go.Figure n'intervient qu'au rendu kaleido
+    fig_ts = figure([line(t, x, "x(t)")], "x(t)", "Temps", "Amplitude x(t)")
+    fig_ph = figure([line(x, v, "Trajectoire")], "Espace des phases", "x", "dx/dt")
+    fig_e = figure(
+        [line(t, ek, "E_kin"), line(t, ep, "E_pot"), line(t, et, "E_tot")],
+        "Énergie du système",
+        "Temps",
+        "Énergie",
     )
-    fig_heat = px.imshow(
-        Z,
-        x=ks,
-        y=gammas,
-        aspect="auto",
-        origin="lower",
-        labels=dict(x="k", y="γ", color="max |x(t)|"),
-        title="Max |x(t)| selon (γ, k)",
+    fig_a = figure([line(t, a, "a(t)")], "a(t)", "Temps", "Accélération")
+
+    # Grille déjà affichée sur la page Heatmap 3D (cache partagé) si disponible,
+    # sinon balayage de la grille demandée (lui-même mémoïsé)
+    stored = load_grid(heat_view.get("token")) if heat_view else None
+    if stored is not None:
+        gammas, ks, channels = stored
+        Z = channels[CHANNELS.index("max_amp")]
+    else:
+        gammas = np.arange(float(heat_gmin), float(heat_gmax) + 1e-9, float(heat_gstep))
+        ks = np.arange(float(heat_kmin), float(heat_kmax) + 1e-9, float(heat_kstep))
+        Z = heatmap_max_amp(
+            gammas,
+            ks,
+            m=1.0,
+            x0=1.0,
+            v0=0.0,
+            t_end=float(tend),
+            t_points=800,
+            mode=heat_mode,
+        )
+    gammas, ks, Z = downsample(gammas, ks, Z, EXPORT_HEATMAP_SIDE)
+    fig_heat = figure(
+        [{
+            "type": "heatmap",
+            "z": Z,
+            "x": ks,
+            "y": gammas,
+            "coloraxis": "coloraxis",
+            "hovertemplate": "k: %{x}<br>γ: %{y}<br>max |x(t)|: %{z}<extra></extra>",
+        }],
+        "Max |x(t)| selon (γ, k)",
+        "k",
+        "γ",
+        coloraxis={"colorscale": "Viridis", "colorbar": {"title": {"text": "max |x(t)|"}}},
     )
 
-    fig_multi = go.Figure()
+    multi = []
     if presets:
         for i, d in enumerate(presets):
             tt, xx, vv = simulate_mro(
@@ -1179,14 +1432,8 @@ def _build_core_figs(
                 v0=v0,
                 t_end=tend,
             )
-            fig_multi.add_trace(
-                go.Scatter(x=tt, y=xx, mode="lines", name=f"Preset {i+1}")
-            )
-    fig_multi.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="x(t)",
-        title="Comparaison de séries",
-    )
+            multi.append(line(tt, xx, f"Preset {i+1}"))
+    fig_multi = figure(multi, "Comparaison de séries", "Temps", "x(t)")
 
     return {
         "time_series": fig_ts,
@@ -1199,6 +1446,8 @@ def _build_core_figs(
 
 
 def _add_png_and_svg_to_zip(zf, fig, basename, width=2400, height=1400, scale=1):
+    # Figure en dict (mro.figures) validée une fois, pour les deux rendus
+    fig = go.Figure(fig)
     try:
         png_bytes = pio.to_image(
             fig, format="png", width=width, height=height, scale=scale
@@ -1226,6 +1475,12 @@ def _add_png_and_svg_to_zip(zf, fig, basename, width=2400, height=1400, scale=1)
 #   Export ZIP callback
 # ===========================
 
+# Grille de la heatmap exportée (celle par défaut de la page Heatmap 3D)
+ZIP_HEATMAP_GRID = (0.0, 0.5, 0.05, 0.5, 3.0, 0.25)
+
+ZIP_FIGURES = ("time_series", "phase_space", "energy", "acc", "heatmap", "multi_series")
+
+
 @callback(
     Output("download-zip", "data"),
     Input("btn-export-zip", "n_clicks"),
@@ -1236,15 +1491,23 @@ def _add_png_and_svg_to_zip(zf, fig, basename, width=2400, height=1400, scale=1)
     State("v0", "value"),
     State("tend", "value"),
     State("presets-store", "data"),
-    State("g-min", "value"),
-    State("g-max", "value"),
-    State("g-step", "value"),
-    State("k-min", "value"),
-    State("k-max", "value"),
-    State("k-step", "value"),
+    State("last-heatmap", "data"),
+    background=True,
+    running=[
+        (Output("btn-export-zip", "disabled"), True, False),
+        (Output("btn-export-zip-cancel", "disabled"), False, True),
+    ],
+    cancel=[Input("btn-export-zip-cancel", "n_clicks")],
+    progress=[
+        Output("zip-progress", "value"),
+        Output("zip-progress", "max"),
+        Output("zip-progress-text", "children"),
+    ],
+    progress_default=["0", str(len(ZIP_FIGURES)), ""],
     prevent_initial_call=True,
 )
 def export_zip(
+    set_progress,
     n,
     m,
     gamma,
@@ -1253,16 +1516,14 @@ def export_zip(
     v0,
     tend,
     presets,
-    gmin,
-    gmax,
-    gstep,
-    kmin,
-    kmax,
-    kstep,
+    last_heatmap,
 ):
     if not n:
         return dash.no_update
 
+    total = len(ZIP_FIGURES)
+    set_progress(("0", str(total), "Calcul des figures…"))
+    gmin, gmax, gstep, kmin, kmax, kstep = ZIP_HEATMAP_GRID
     figs = _build_core_figs(
         m,
         gamma,
@@ -1277,7 +1538,12 @@ def export_zip(
         kmin,
         kmax,
         kstep,
+        heat_view=last_heatmap,
     )
+    # Cellules calculées dans ce processus jetable : déposées pour la suite
+    TILE_STORE.flush()
+    # Axes réellement exportés (grille de la page Heatmap 3D si réutilisée)
+    heat_k, heat_g = figs["heatmap"]["data"][0]["x"], figs["heatmap"]["data"][0]["y"]
 
     buf = io.BytesIO()
     with zipfile.ZipFile(
@@ -1286,19 +1552,16 @@ def export_zip(
         compression=zipfile.ZIP_DEFLATED,
     ) as zf:
         ts = dt.datetime.now().strftime("%Y%m%d_%H%M")
-        _add_png_and_svg_to_zip(zf, figs["time_series"], f"time_series_{ts}")
-        _add_png_and_svg_to_zip(zf, figs["phase_space"], f"phase_space_{ts}")
-        _add_png_and_svg_to_zip(zf, figs["energy"], f"energy_{ts}")
-        _add_png_and_svg_to_zip(zf, figs["acc"], f"acc_{ts}")
-        _add_png_and_svg_to_zip(zf, figs["heatmap"], f"heatmap_{ts}")
-        _add_png_and_svg_to_zip(zf, figs["multi_series"], f"multi_series_{ts}")
+        for i, name in enumerate(ZIP_FIGURES, start=1):
+            _add_png_and_svg_to_zip(zf, figs[name], f"{name}_{ts}")
+            set_progress((str(i), str(total), f"{i}/{total} figures rendues"))
         zf.writestr(
             "README.txt",
             (
                 "Exports MRO (PNG+SVG HD)\n"
                 f"Paramètres courants: m={m}, gamma={gamma}, k={k}, x0={x0}, v0={v0}, t_end={tend}\n"
-                f"Grille heatmap: gamma=[{gmin},{gmax}] step {gstep} ; "
-                f"k=[{kmin},{kmax}] step {kstep}\n"
+                f"Grille heatmap: gamma=[{heat_g[0]:g},{heat_g[-1]:g}] ({len(heat_g)} points) ; "
+                f"k=[{heat_k[0]:g},{heat_k[-1]:g}] ({len(heat_k)} points)\n"
             ),
         )
 
@@ -1325,16 +1588,11 @@ def export_zip(
 def export_csv(n, m, gamma, k, x0, v0, tend):
     if not n:
         return dash.no_update
-    t, x, v = simulate_mro(m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=tend)
-    a = -(gamma / m) * v - (k / m) * x
-    ek = 0.5 * m * (v ** 2)
-    ep = 0.5 * k * (x ** 2)
-    et = ek + ep
+    # Trajectoire partagée avec update_core_plots via le cache de résultats
+    sim = simulate_mro(m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=tend)
     sio = io.StringIO()
-    sio.write("t,x,v,a,E_kin,E_pot,E_tot\n")
-    for i in range(len(t)):
-        sio.write(f"{t[i]},{x[i]},{v[i]},{a[i]},{ek[i]},{ep[i]},{et[i]}\n")
-    sio.seek(0)
+    for block in write_csv([sim], m, gamma, k):
+        sio.write(block)
     fname = f"mro_data_{dt.datetime.now().strftime('%Y%m%d_%H%M')}.csv"
     return dcc.send_string(sio.getvalue(), filename=fname)
 
@@ -1353,25 +1611,13 @@ def export_csv(n, m, gamma, k, x0, v0, tend):
 def export_json(n, m, gamma, k, x0, v0, tend):
     if not n:
         return dash.no_update
-    t, x, v = simulate_mro(m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=tend)
-    a = -(gamma / m) * v - (k / m) * x
-    ek = 0.5 * m * (v ** 2)
-    ep = 0.5 * k * (x ** 2)
-    et = ek + ep
-    payload = {
-        "params": {"m": m, "gamma": gamma, "k": k, "x0": x0, "v0": v0, "t_end": tend},
-        "series": {
-            "t": list(map(float, t)),
-            "x": list(map(float, x)),
-            "v": list(map(float, v)),
-            "a": list(map(float, a)),
-            "E_kin": list(map(float, ek)),
-            "E_pot": list(map(float, ep)),
-            "E_tot": list(map(float, et)),
-        },
-    }
     fname = f"mro_data_{dt.datetime.now().strftime('%Y%m%d_%H%M')}.json"
-    return dcc.send_string(json.dumps(payload), filename=fname)
+    params = {"m": m, "gamma": gamma, "k": k, "x0": x0, "v0": v0, "t_end": tend}
+    content = "".join(write_json(
+        lambda: [simulate_mro(m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=tend)],
+        params, m, gamma, k,
+    ))
+    return dcc.send_string(content, filename=fname)
 
 
 # ===========================
@@ -1428,13 +1674,8 @@ def add_preset(n, m, g, k, data):
     State("tend", "value"),
 )
 def update_multi(data, x0, v0, tend):
-    fig = go.Figure()
     # Affiche au moins une grille vide pour UX
-    fig.update_layout(
-        xaxis_title="Temps",
-        yaxis_title="x(t)",
-        title="Comparaison de séries",
-    )
+    fig = figure([], "Comparaison de séries", "Temps", "x(t)")
 
     if not data:
         return fig
@@ -1454,11 +1695,10 @@ def update_multi(data, x0, v0, tend):
             # Si un preset est invalide, on continue
             continue
 
-        fig.add_trace(
-            go.Scatter(x=t, y=x, mode="lines", name=f"Preset {i+1}")
-        )
+        idx = decimate_indices(t, x)
+        fig["data"].append(line(t[idx], x[idx], f"Preset {i+1}"))
 
-    return fig
+    return encode_figures("update_multi", fig)[0]
 
 
 # ===========================
@@ -0,0 +1,81 @@
+// ===========================
+//   Aperçu instantané des sliders (solution exacte côté navigateur)
+// ===========================
+//
+// Pendant le glissement, les sliders (updatemode="mouseup") ne contactent pas
+// le serveur : drag_value déclenche ce callback client, qui évalue la forme
+// fermée de mro/analytic.py et remplace les traces par un dash_clientside.Patch.
+// Au relâchement, update_core_plots renvoie les données de référence
+// (simulation, décimation LTTB, exports) et écrase l'aperçu.
+(function () {
+    // Échantillons par trace (uniformes : la décimation reste côté serveur)
+    const POINTS = 1000;
+
+    // Ec, Es : même découpage en régimes que damped_basis (mro/analytic.py)
+    function dampedBasis(t, beta, w0sq) {
+        const q = w0sq - beta * beta;
+        if (q > 0) {
+            const wd = Math.sqrt(q);
+            const decay = Math.exp(-beta * t);
+            return [decay * Math.cos(wd * t), decay * Math.sin(wd * t) / wd];
+        }
+        // Sur-amorti / critique : exponentielles séparées (pas de cosh qui déborde)
+        const s = Math.sqrt(-q);
+        const fast = beta + s;
+        const slow = fast > 0 ? w0sq / fast : 0;
+        const eSlow = Math.exp(-slow * t);
+        const ec = 0.5 * (eSlow + Math.exp(-fast * t));
+        const es = s > 0 ? eSlow * (-Math.expm1(-2 * s * t)) / (2 * s) : t * eSlow;
+        return [ec, es];
+    }
+
+    function series(m, gamma, k, x0, v0, tend) {
+        const beta = gamma / (2 * m);
+        const w0sq = k / m;
+        const out = {t: [], x: [], v: [], a: [], ek: [], ep: [], et: []};
+        for (let i = 0; i < POINTS; i++) {
+            const t = tend * i / (POINTS - 1);
+            const [ec, es] = dampedBasis(t, beta, w0sq);
+            const x = x0 * ec + (v0 + beta * x0) * es;
+            const v = v0 * ec - (w0sq * x0 + beta * v0) * es;
+            const ek = 0.5 * m * v * v;
+            const ep = 0.5 * k * x * x;
+            out.t.push(t);
+            out.x.push(x);
+            out.v.push(v);
+            out.a.push(-(gamma / m) * v - (k / m) * x);
+            out.ek.push(ek);
+            out.ep.push(ep);
+            out.et.push(ek + ep);
+        }
+        return out;
+    }
+
+    function tracePatch(traces) {
+        const patch = new window.dash_clientside.Patch();
+        traces.forEach(([x, y], i) => {
+            patch.assign(['data', i, 'x'], x);
+            patch.assign(['data', i, 'y'], y);
+        });
+        return patch.build();
+    }
+
+    window.dash_clientside = window.dash_clientside || {};
+    window.dash_clientside.mro = {
+        preview: function (m, gamma, k, x0, v0, tend, opts, drawn) {
+            const noUpdate = window.dash_clientside.no_update;
+            const params = [m, gamma, k, x0, v0, tend];
+            // Graphes pas encore dessinés ou aperçu désactivé : rien à patcher
+            if (!drawn || !(opts || []).includes('live') || params.some(p => p == null) || m <= 0) {
+                return [noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+            const s = series(...params);
+            return [
+                tracePatch([[s.t, s.x]]),
+                tracePatch([[s.x, s.v]]),
+                tracePatch([[s.t, s.ek], [s.t, s.ep], [s.t, s.et]]),
+                tracePatch([[s.t, s.a]]),
+            ];
+        },
+    };
+})();
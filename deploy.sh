@@ -81,6 +81,10 @@ fi
 log "Vérification syntaxe Python…"
 python -m py_compile app.py pages/*.py 2>/dev/null || true
 
+# Atlas (m, γ, k) précalculé, lu en memmap par les workers (non bloquant)
+log "Construction de l'atlas MRO…"
+python -m mro.build_atlas >/dev/null || warn "Atlas non construit (calcul à la volée)."
+
 # Restart service
 log "Restart service ${SERVICE_NAME}…"
 sudo systemctl daemon-reload || true
@@ -0,0 +1,138 @@
+from .adaptive import adaptive_depth, adaptive_sweep
+from .analytic import analytic_state, damped_basis, simulate_analytic
+from .atlas import Atlas, build_atlas, get_atlas
+from .batch import batch_max_amp, chunk_cells, grid_max_amp
+from .budget import (
+    BudgetExceeded,
+    estimate_seconds,
+    plan_grid,
+    strided_axis,
+    sweep_budget,
+    sweep_deadline,
+    sweep_max_cells,
+)
+from .channels import CHANNEL_LABELS, CHANNELS, analytic_channels, sampled_channels
+from .core import (
+    BACKENDS,
+    MRO_equations,
+    RESULT_CACHE,
+    SHARED_CACHE,
+    TILE_STORE,
+    cache_stats,
+    default_backend,
+    get_backend,
+    load_grid,
+    recall,
+    register_backend,
+    remember,
+    simulate,
+    simulate_batch,
+    store_grid,
+    sweep_channels,
+    sweep_metric,
+)
+from .decimate import curve_indices, decimate_indices, lttb_indices, plot_points
+from .figures import MRO_LAB_TEMPLATE, figure, line, vline
+from .memo import make_key
+from .metrics import METRICS, grid_metric, peak_metrics
+from .parallel import parallel_cells, pool_size, shutdown_pool
+from .propagator import propagate, propagator_matrix, simulate_propagator
+from .raster import downsample, palette, quantize, raster_grid
+from .reduced import ZetaTable, grid_metric_reduced, zeta_table
+from .sharedcache import SharedCache
+from .stream import (
+    iter_csv,
+    iter_json,
+    iter_simulation,
+    minmax_decimate,
+    spectrum_max_points,
+    stream_max_points,
+    welch_spectrum,
+    write_csv,
+    write_json,
+)
+from .tiles import TileStore
+from .typedarrays import encode_figure, encode_figures, encode_patch, payload_stats, typed_array
+
+__all__ = [
+    "BACKENDS",
+    "BudgetExceeded",
+    "CHANNEL_LABELS",
+    "CHANNELS",
+    "Atlas",
+    "MRO_equations",
+    "RESULT_CACHE",
+    "SHARED_CACHE",
+    "TILE_STORE",
+    "TileStore",
+    "METRICS",
+    "MRO_LAB_TEMPLATE",
+    "SharedCache",
+    "ZetaTable",
+    "adaptive_depth",
+    "adaptive_sweep",
+    "analytic_channels",
+    "analytic_state",
+    "batch_max_amp",
+    "build_atlas",
+    "cache_stats",
+    "chunk_cells",
+    "curve_indices",
+    "damped_basis",
+    "decimate_indices",
+    "default_backend",
+    "downsample",
+    "encode_figure",
+    "encode_figures",
+    "encode_patch",
+    "estimate_seconds",
+    "figure",
+    "get_atlas",
+    "get_backend",
+    "grid_max_amp",
+    "grid_metric",
+    "grid_metric_reduced",
+    "iter_csv",
+    "iter_json",
+    "iter_simulation",
+    "line",
+    "load_grid",
+    "lttb_indices",
+    "make_key",
+    "minmax_decimate",
+    "palette",
+    "parallel_cells",
+    "payload_stats",
+    "peak_metrics",
+    "plan_grid",
+    "plot_points",
+    "pool_size",
+    "propagate",
+    "propagator_matrix",
+    "quantize",
+    "raster_grid",
+    "recall",
+    "register_backend",
+    "remember",
+    "sampled_channels",
+    "shutdown_pool",
+    "simulate",
+    "simulate_analytic",
+    "simulate_batch",
+    "simulate_propagator",
+    "spectrum_max_points",
+    "store_grid",
+    "stream_max_points",
+    "strided_axis",
+    "sweep_budget",
+    "sweep_channels",
+    "sweep_deadline",
+    "sweep_max_cells",
+    "sweep_metric",
+    "typed_array",
+    "vline",
+    "welch_spectrum",
+    "write_csv",
+    "write_json",
+    "zeta_table",
+]
@@ -0,0 +1,154 @@
+import numpy as np
+
+from .channels import check_channels
+from .core import SWEEP_MODES, _cached, channel_cells, default_backend, sweep_cells
+from .memo import make_key
+
+
+# ===========================
+#   Échantillonnage adaptatif (quadtree) du plan (γ, k)
+# ===========================
+#
+# On part d'une grille grossière et on ne subdivise (en 4) que les cellules
+# dont les coins changent de régime (γ² − 4mk change de signe) ou dont la
+# métrique varie de plus de tol × (étendue globale). Les points vivent sur un
+# réseau entier dyadique (pas le plus fin = 1), ce qui déduplique les sommets
+# partagés ; chaque niveau est évalué en un seul lot vectorisé. Avec
+# channels=, chaque point porte tous les canaux (mro.channels), le
+# raffinement suivant le seul canal metric. Si on_level renvoie True
+# (échéance dépassée…), le raffinement s'arrête au niveau atteint : résultat
+# partiel, renvoyé sans passer par le cache.
+
+
+class _Stopped(Exception):
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+
+
+def adaptive_depth(n_g, n_k, base=8):
+    # Profondeur et grille de départ telles que le pas le plus fin ≤ pas demandé
+    depth = max(0, int(np.ceil(np.log2(max(n_g, n_k, 1) / base))))
+    scale = 2 ** depth
+    return depth, max(2, -(-n_g // scale)), max(2, -(-n_k // scale))
+
+
+def _refine_mask(I, J, s, vals, crit_g, crit_k, tol_abs):
+    corners = np.stack([vals[I, J], vals[I + s, J], vals[I, J + s], vals[I + s, J + s]])
+    with np.errstate(invalid="ignore"):
+        spread = np.nanmax(corners, axis=0) - np.nanmin(corners, axis=0)
+    # γ² − 4mk est monotone en γ et en k : ses extrêmes sur la cellule sont
+    # atteints aux coins opposés
+    lo = crit_g[I] - crit_k[J + s]
+    hi = crit_g[I + s] - crit_k[J]
+    straddle = (lo <= 0) & (hi >= 0)
+    return straddle | ~(spread <= tol_abs)
+
+
+def adaptive_sweep(
+    gmin,
+    gmax,
+    kmin,
+    kmax,
+    metric="max_amp",
+    m=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=800,
+    mode="table",
+    backend=None,
+    base=(8, 8),
+    depth=4,
+    tol=0.02,
+    on_level=None,
+    channels=None,
+    **options,
+):
+    # Renvoie (G, K, Z) : points évalués (tableaux plats, ordre quelconque) ;
+    # Z de forme (n,), ou (C, n) avec channels=.
+    # on_level(niveau, profondeur, évaluations) est appelé après chaque niveau ;
+    # True arrête le raffinement.
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Mode inconnu : {mode!r} (attendu : {', '.join(SWEEP_MODES)})")
+    backend = backend or default_backend()
+    bg, bk = int(base[0]), int(base[1])
+    depth = int(depth)
+    if channels is not None:
+        channels = check_channels(channels)
+        if metric not in channels:
+            raise ValueError(f"Canal de raffinement absent : {metric!r}")
+    sampling = (t_points, backend, options) if mode == "sampled" else None
+    key = make_key(
+        "adaptive", gmin, gmax, kmin, kmax, metric, m, x0, v0, t_end, mode, sampling,
+        bg, bk, depth, tol, channels,
+    )
+    spec = dict(
+        m=m, x0=x0, v0=v0, t_end=t_end, t_points=t_points,
+        mode=mode, backend=backend, options=options,
+    )
+    width = () if channels is None else (len(channels),)
+    c = 0 if channels is None else channels.index(metric)
+
+    def cells(G, K):
+        if channels is None:
+            return sweep_cells(G, K, metric=metric, **spec)
+        return channel_cells(G, K, channels=channels, **spec)
+
+    def compute():
+        step = 2 ** depth
+        ng, nk = bg * step, bk * step
+        g_axis = np.linspace(float(gmin), float(gmax), ng + 1)
+        k_axis = np.linspace(float(kmin), float(kmax), nk + 1)
+        vals = np.full((ng + 1, nk + 1) + width, np.nan)
+        # Vue du canal de raffinement
+        metric_vals = vals if channels is None else vals[..., c]
+        known = np.zeros((ng + 1, nk + 1), bool)
+        # γ² − 4mk se sépare en γ² (ligne) − 4mk (colonne)
+        crit_g, crit_k = g_axis ** 2, 4.0 * m * k_axis
+
+        def evaluate(I, J):
+            keep = ~known[I, J]
+            I, J = I[keep], J[keep]
+            if I.size:
+                flat = np.unique(I * (nk + 1) + J)
+                I, J = flat // (nk + 1), flat % (nk + 1)
+                vals[I, J] = cells(g_axis[I], k_axis[J])
+                known[I, J] = True
+
+        I0, J0 = np.meshgrid(np.arange(0, ng + 1, step), np.arange(0, nk + 1, step), indexing="ij")
+        evaluate(I0.ravel(), J0.ravel())
+        finite = metric_vals[known & np.isfinite(metric_vals)]
+        tol_abs = tol * (np.ptp(finite) if finite.size else 0.0)
+
+        I, J = np.meshgrid(np.arange(0, ng, step), np.arange(0, nk, step), indexing="ij")
+        I, J = I.ravel(), J.ravel()
+        s = step
+        level = 0
+        stopped = on_level is not None and bool(on_level(level, depth, int(known.sum())))
+        while s > 1 and I.size and not stopped:
+            refine = _refine_mask(I, J, s, metric_vals, crit_g, crit_k, tol_abs)
+            I, J = I[refine], J[refine]
+            h = s // 2
+            evaluate(
+                np.concatenate([I + h, I, I + h, I + s, I + h]),
+                np.concatenate([J, J + h, J + h, J + h, J + s]),
+            )
+            I = np.concatenate([I, I + h, I, I + h])
+            J = np.concatenate([J, J, J + h, J + h])
+            s = h
+            level += 1
+            if on_level is not None:
+                stopped = bool(on_level(level, depth, int(known.sum())))
+
+        gi, ki = np.nonzero(known)
+        Z = vals[gi, ki]
+        result = g_axis[gi], k_axis[ki], Z if channels is None else np.ascontiguousarray(Z.T)
+        if stopped and s > 1 and I.size:
+            raise _Stopped(result)
+        return result
+
+    try:
+        return _cached(key, compute)
+    except _Stopped as e:
+        return e.result
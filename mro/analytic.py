@@ -0,0 +1,105 @@
+import numpy as np
+
+
+# ===========================
+#   Solution exacte du MRO
+# ===========================
+#
+# m·x'' + γ·x' + k·x = 0  ⇔  x'' + 2β·x' + ω0²·x = 0
+# avec β = γ / 2m et ω0² = k / m.
+#
+# On écrit la solution sous la forme
+#     x(t) = x0·Ec(t) + (v0 + β·x0)·Es(t)
+#     v(t) = v0·Ec(t) − (ω0²·x0 + β·v0)·Es(t)
+# où Ec = e^{-βt}·C(t), Es = e^{-βt}·S(t) et (C, S) valent
+# (cos ωd·t, sin ωd·t / ωd) en sous-amorti, (cosh s·t, sinh s·t / s)
+# en sur-amorti et (1, t) au point critique. Les formes ci-dessous sont
+# continues à travers γ² = 4mk : aucune branche « critique » séparée.
+
+
+def broadcast_params(*params):
+    # Paramètres quelconques (scalaires ou tableaux) diffusés en flottants
+    return np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in params))
+
+
+def flat_params(*params):
+    # Forme commune + paramètres aplatis (une cellule par élément)
+    arrays = broadcast_params(*params)
+    return arrays[0].shape, [a.ravel() for a in arrays]
+
+
+def tanh_root(num, den, s, over):
+    # Premier t > 0 tel que tanh(s·t) = s·num/den, soit t = (num/den)·atanh(r)/r
+    # avec r = s·num/den ; np.inf hors des cellules `over` ou sans solution
+    den_safe = np.where(den != 0, den, 1.0)
+    ratio = num / den_safe
+    r = ratio * s
+    valid = over & (den != 0) & (ratio > 0) & (r < 1)
+    r_safe = np.where(valid, r, 0.0)
+    small = np.abs(r_safe) < 1e-8
+    atanhc = np.where(small, 1.0 + r_safe**2 / 3.0, np.arctanh(r_safe) / np.where(small, 1.0, r_safe))
+    return np.where(valid, ratio * atanhc, np.inf)
+
+
+def damped_basis(t, beta, w0sq):
+    t, beta, w0sq = broadcast_params(t, beta, w0sq)
+    q = w0sq - beta * beta
+    under = q > 0
+    over = ~under
+    ec = np.empty(t.shape)
+    es = np.empty(t.shape)
+
+    # Chaque échantillon n'évalue que la branche de son régime
+    if under.any():
+        tu, bu = t[under], beta[under]
+        wd = np.sqrt(q[under])
+        decay = np.exp(-bu * tu)
+        ec[under] = decay * np.cos(wd * tu)
+        # sin(ωd·t)/ωd reste exact quand ωd → 0 (sin(ε) = ε en flottant)
+        es[under] = decay * np.sin(wd * tu) / wd
+
+    # --- Sur-amorti / critique : exponentielles séparées (pas de cosh qui déborde) ---
+    if over.any():
+        to, bo, wo = t[over], beta[over], w0sq[over]
+        s = np.sqrt(-q[over])
+        fast = bo + s
+        # β − s = ω0² / (β + s) évite l'annulation catastrophique quand k est petit
+        slow = np.divide(wo, fast, out=np.zeros_like(fast), where=fast > 0)
+        e_slow = np.exp(-slow * to)
+        ec[over] = 0.5 * (e_slow + np.exp(-fast * to))
+        s_safe = np.where(s > 0, s, 1.0)
+        es[over] = np.where(
+            s > 0,
+            e_slow * (-np.expm1(-2.0 * s_safe * to)) / (2.0 * s_safe),
+            to * e_slow,
+        )
+
+    return ec, es
+
+
+def analytic_state(t, m, gamma, k, x0, v0):
+    m = np.asarray(m, dtype=float)
+    beta = np.asarray(gamma, dtype=float) / (2.0 * m)
+    w0sq = np.asarray(k, dtype=float) / m
+    x0 = np.asarray(x0, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+
+    ec, es = damped_basis(t, beta, w0sq)
+    x = x0 * ec + (v0 + beta * x0) * es
+    v = v0 * ec - (w0sq * x0 + beta * v0) * es
+    return x, v
+
+
+def simulate_analytic(
+    m=1.0,
+    gamma=0.15,
+    k=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+):
+    t = np.linspace(t_start, t_end, t_points)
+    x, v = analytic_state(t - t_start, m, gamma, k, x0, v0)
+    return t, x, v
@@ -0,0 +1,154 @@
+import json
+import os
+
+import numpy as np
+
+from .metrics import METRICS, peak_metrics
+
+
+# ===========================
+#   Atlas précalculé de l'espace (m, γ, k)
+# ===========================
+#
+# Un cube float32 (métrique, m, γ, k) écrit une fois par `python -m mro.build_atlas`
+# puis ouvert en np.memmap par chaque worker : lecture paresseuse, sans copie,
+# pages partagées par le cache du système entre tous les processus.
+#
+# L'atlas est calculé pour x0 = 1, v0 = 0 (conditions des heatmaps). Pour
+# v0 = 0, toutes les métriques sont indépendantes de t_end (|x(t)| ≤ |x0|)
+# et, par linéarité, les amplitudes se mettent à l'échelle de |x0|.
+
+DEFAULT_ATLAS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "mro_atlas.npy"
+)
+
+# Domaine des sliders : m (0.1 → 5, pas 0.1), γ (0 → 2), k (0 → 5)
+DEFAULT_AXES = {
+    "m": (0.1, 5.0, 0.1),
+    "gamma": (0.0, 2.0, 0.01),
+    "k": (0.0, 5.0, 0.01),
+}
+
+_SCALED = {"max_amp", "peak_amp"}
+
+
+def _axis(lo, hi, step):
+    n = int(round((hi - lo) / step)) + 1
+    return lo + step * np.arange(n)
+
+
+def build_atlas(path=DEFAULT_ATLAS_PATH, axes=DEFAULT_AXES):
+    m_ax, g_ax, k_ax = (_axis(*axes[name]) for name in ("m", "gamma", "k"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    cube = np.lib.format.open_memmap(
+        tmp, mode="w+", dtype=np.float32, shape=(len(METRICS), m_ax.size, g_ax.size, k_ax.size)
+    )
+    G, K = np.meshgrid(g_ax, k_ax, indexing="ij")
+    for i, m in enumerate(m_ax):
+        met = peak_metrics(m, G, K, x0=1.0, v0=0.0)
+        for c, name in enumerate(METRICS):
+            cube[c, i] = met[name]
+    cube.flush()
+    del cube
+    meta = {
+        "metrics": list(METRICS),
+        "axes": {"m": m_ax.tolist(), "gamma": g_ax.tolist(), "k": k_ax.tolist()},
+        "x0": 1.0,
+        "v0": 0.0,
+    }
+    with open(tmp + ".json", "w") as f:
+        json.dump(meta, f)
+    # Remplacement atomique : un worker ne voit jamais un atlas à moitié écrit
+    os.replace(tmp, path)
+    os.replace(tmp + ".json", os.path.splitext(path)[0] + ".json")
+    return path
+
+
+def _fractional_index(axis, values):
+    # Position fractionnaire dans un axe régulier ; None si hors domaine
+    values = np.asarray(values, dtype=float)
+    tol = 1e-9 * max(1.0, abs(axis[-1]))
+    if values.size and (values.min() < axis[0] - tol or values.max() > axis[-1] + tol):
+        return None
+    pos = np.interp(values, axis, np.arange(axis.size, dtype=float))
+    lo = np.clip(np.floor(pos + 1e-6).astype(int), 0, max(axis.size - 2, 0))
+    w = pos - lo
+    w[np.abs(w) < 1e-6] = 0.0
+    w[np.abs(w - 1.0) < 1e-6] = 1.0
+    return lo, w
+
+
+def _lerp(a, b, w):
+    # Interpolation qui n'évalue pas b quand son poids est nul. Un nœud non
+    # fini (inf / NaN, de part et d'autre de la courbe critique) n'est jamais
+    # mélangé : on prend le nœud le plus proche.
+    if not np.any(w > 0):
+        return a
+    with np.errstate(invalid="ignore"):
+        mix = a * (1.0 - w) + b * w
+    mix = np.where(np.isfinite(a) & np.isfinite(b), mix, np.where(w < 0.5, a, b))
+    return np.where(w >= 1, b, np.where(w > 0, mix, a))
+
+
+class Atlas:
+    def __init__(self, path):
+        with open(os.path.splitext(path)[0] + ".json") as f:
+            meta = json.load(f)
+        self.path = path
+        self.metrics = meta["metrics"]
+        self.m = np.asarray(meta["axes"]["m"])
+        self.gamma = np.asarray(meta["axes"]["gamma"])
+        self.k = np.asarray(meta["axes"]["k"])
+        self.cube = np.load(path, mmap_mode="r")
+
+    def lookup(self, metric, m, gammas, ks, x0=1.0, v0=0.0, interpolate=True):
+        # Grille (len(gammas), len(ks)) ou None si la requête sort de l'atlas
+        # (ou, interpolate=False, tombe entre deux nœuds)
+        if metric not in self.metrics or v0 != 0 or x0 == 0:
+            return None
+        im = _fractional_index(self.m, [m])
+        ig = _fractional_index(self.gamma, gammas)
+        ik = _fractional_index(self.k, ks)
+        if im is None or ig is None or ik is None:
+            return None
+        if not interpolate and any(np.any((w > 0) & (w < 1)) for _, w in (im, ig, ik)):
+            return None
+
+        c = self.metrics.index(metric)
+        (m_lo,), (m_w,) = im
+        (g_lo, g_w), (k_lo, k_w) = ig, ik
+        g_w, k_w = g_w[:, None], k_w[None, :]
+
+        def plane(i):
+            P = self.cube[c, i]
+            a = _lerp(P[np.ix_(g_lo, k_lo)], P[np.ix_(g_lo, k_lo + 1)] if k_w.any() else 0.0, k_w)
+            if not g_w.any():
+                return a.astype(float)
+            b = _lerp(P[np.ix_(g_lo + 1, k_lo)], P[np.ix_(g_lo + 1, k_lo + 1)] if k_w.any() else 0.0, k_w)
+            return _lerp(a, b, g_w).astype(float)
+
+        Z = plane(m_lo)
+        if m_w > 0:
+            Z = _lerp(Z, plane(m_lo + 1), m_w)
+        if metric in _SCALED:
+            Z = Z * abs(x0)
+        return Z
+
+
+_ATLAS = None
+_ATLAS_LOADED = False
+
+
+def get_atlas():
+    # Ouverture paresseuse (une fois par worker) ; None si l'atlas n'a pas été construit
+    global _ATLAS, _ATLAS_LOADED
+    if not _ATLAS_LOADED:
+        path = os.environ.get("MRO_ATLAS", DEFAULT_ATLAS_PATH)
+        try:
+            _ATLAS = Atlas(path) if path.lower() != "off" else None
+        except (OSError, ValueError, KeyError):
+            _ATLAS = None
+        _ATLAS_LOADED = True
+    return _ATLAS
+
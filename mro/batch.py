@@ -0,0 +1,74 @@
+import numpy as np
+
+from .analytic import analytic_state, flat_params
+
+
+# ===========================
+#   Balayages vectorisés (grille entière)
+# ===========================
+
+# Budget mémoire par bloc de cellules (octets). Chaque bloc évalue
+# cells × t_points échantillons en une seule expression NumPy.
+DEFAULT_CHUNK_BYTES = 64 * 2**20
+
+# Nombre approximatif de tableaux (cells × t_points) vivants en même temps
+# pendant analytic_state : sert à convertir le budget en nombre de cellules.
+_TEMPORARIES = 16
+
+
+def chunk_cells(t_points, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    per_cell = _TEMPORARIES * 8 * max(int(t_points), 1)
+    return max(1, int(chunk_bytes) // per_cell)
+
+
+def batch_max_amp(
+    m,
+    gamma,
+    k,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=2000,
+    chunk_bytes=DEFAULT_CHUNK_BYTES,
+):
+    # Paramètres quelconques (scalaires ou tableaux) diffusés ensemble ;
+    # le résultat a la forme commune.
+    shape, params = flat_params(m, gamma, k, x0, v0)
+    m, gamma, k, x0, v0 = (p[:, None] for p in params)
+
+    t = np.linspace(0.0, t_end, t_points)[None, :]
+    out = np.empty(m.shape[0])
+    step = chunk_cells(t_points, chunk_bytes)
+    for lo in range(0, m.shape[0], step):
+        sl = slice(lo, lo + step)
+        x, _ = analytic_state(t, m[sl], gamma[sl], k[sl], x0[sl], v0[sl])
+        out[sl] = np.max(np.abs(x), axis=1)
+    return out.reshape(shape)
+
+
+def grid_max_amp(
+    gammas,
+    ks,
+    m=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=2000,
+    chunk_bytes=DEFAULT_CHUNK_BYTES,
+):
+    # Grille (len(gammas), len(ks)) : même convention que heatmap_max_amp
+    G, K = np.meshgrid(
+        np.asarray(gammas, dtype=float),
+        np.asarray(ks, dtype=float),
+        indexing="ij",
+    )
+    return batch_max_amp(
+        m,
+        G,
+        K,
+        x0=x0,
+        v0=v0,
+        t_end=t_end,
+        t_points=t_points,
+        chunk_bytes=chunk_bytes,
+    )
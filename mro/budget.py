@@ -0,0 +1,173 @@
+import os
+import time
+
+import numpy as np
+
+from .channels import CHANNELS
+from .core import CHANNEL_BLOCK, channel_cells, default_backend
+
+
+# ===========================
+#   Modèle de coût des balayages (γ, k)
+# ===========================
+#
+# Coût estimé = cellules × échantillons × coût unitaire du backend (mesuré sur
+# un cœur du VPS ; MRO_COST_SCALE corrige pour une autre machine, mesure
+# automatique pour les balayages multi-canaux, voir plus bas). Au-delà du
+# budget, la grille est sous-échantillonnée (ou refusée) avant tout calcul ;
+# l'échéance (deadline) borne ensuite le temps réel, grille partielle comprise.
+# Le plafond de cellules borne la mémoire, quel que soit le coût estimé : une
+# grille multi-canal occupe C × 8 octets par cellule, plus la copie de l'export.
+#
+#   MRO_SWEEP_BUDGET_S     budget estimé par requête (20 s par défaut)
+#   MRO_SWEEP_MAX_CELLS    cellules par grille (4 000 000 par défaut)
+#   MRO_SWEEP_DEADLINE_S   échéance dure en temps réel (60 s par défaut)
+#   MRO_SWEEP_POLICY       "coarsen" (défaut) ou "refuse"
+
+# Secondes par cellule × échantillon (mode "sampled")
+SAMPLE_COST = {
+    "analytic": 1.0e-7,
+    "propagator": 2.5e-8,
+    "numba": 5.0e-8,
+    "scipy": 4.0e-6,
+}
+
+# Secondes par cellule (modes sans trajectoire)
+CELL_COST = {
+    "exact": 4.0e-7,
+    "table": 5.0e-7,
+}
+
+# Secondes par cellule d'un balayage multi-canal sans trajectoire (pics,
+# passages par zéro, empilement des canaux, cache de tuiles) : sweep_channels
+# complet sur des grilles de 10⁶ cellules, valeur haute (médiane ~0,55 µs en
+# exact, ~0,4 µs en table). L'écart entre machines dépasse ×4 sur ce moteur
+# limité par la mémoire : sauf MRO_COST_SCALE explicite, ces coûts sont
+# rapportés à la durée d'un bloc témoin (CHANNEL_BLOCK cellules, tous
+# régimes) mesurée une fois par processus, jamais en dessous de la référence.
+CHANNEL_CELL_COST = {
+    "exact": 1.3e-6,
+    "table": 1.0e-6,
+}
+
+# Durée du bloc témoin sur la machine de référence (secondes)
+CHANNEL_PROBE_S = {
+    "exact": 0.011,
+    "table": 0.0085,
+}
+_PROBE_SCALE = {}
+
+# Surcoût d'un balayage multi-canal échantillonné (FFT, énergie…) vs max_amp seul
+CHANNELS_OVERHEAD = 1.5
+
+BUDGET_POLICIES = ("coarsen", "refuse")
+
+
+class BudgetExceeded(ValueError):
+    pass
+
+
+def cost_scale():
+    return float(os.environ.get("MRO_COST_SCALE", 1.0))
+
+
+def _probe_seconds(mode):
+    # Meilleur de 3 passages d'un bloc (γ, k) couvrant sous- et sur-amorti
+    side = int(np.sqrt(CHANNEL_BLOCK))
+    G, K = np.meshgrid(np.linspace(0.0, 4.0, side), np.linspace(0.0, 5.0, CHANNEL_BLOCK // side),
+                       indexing="ij")
+    G, K = G.ravel(), K.ravel()
+    best = np.inf
+    for _ in range(3):
+        start = time.perf_counter()
+        channel_cells(G, K, CHANNELS, 1.0, 1.0, 0.0, 30.0, 1, mode, None, {})
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def channel_cost_scale(mode):
+    # Facteur machine des coûts multi-canaux sans trajectoire
+    if "MRO_COST_SCALE" in os.environ:
+        return cost_scale()
+    if mode not in _PROBE_SCALE:
+        _PROBE_SCALE[mode] = max(1.0, _probe_seconds(mode) / CHANNEL_PROBE_S[mode])
+    return _PROBE_SCALE[mode]
+
+
+def sweep_budget():
+    return float(os.environ.get("MRO_SWEEP_BUDGET_S", 20.0))
+
+
+def sweep_deadline():
+    return float(os.environ.get("MRO_SWEEP_DEADLINE_S", 60.0))
+
+
+def sweep_max_cells():
+    return int(float(os.environ.get("MRO_SWEEP_MAX_CELLS", 4_000_000)))
+
+
+def budget_policy():
+    policy = os.environ.get("MRO_SWEEP_POLICY", "coarsen")
+    if policy not in BUDGET_POLICIES:
+        raise ValueError(f"Politique inconnue : {policy!r} (attendu : {', '.join(BUDGET_POLICIES)})")
+    return policy
+
+
+def estimate_seconds(cells, t_points=800, mode="sampled", backend=None, channels=False):
+    if mode == "sampled":
+        # Backend inconnu (enregistré via register_backend) : hypothèse prudente
+        unit = SAMPLE_COST.get(backend or default_backend(), max(SAMPLE_COST.values()))
+        per_cell = unit * max(int(t_points), 1) * (CHANNELS_OVERHEAD if channels else 1.0)
+        scale = cost_scale()
+    elif channels:
+        per_cell, scale = CHANNEL_CELL_COST[mode], channel_cost_scale(mode)
+    else:
+        per_cell, scale = CELL_COST[mode], cost_scale()
+    return cells * per_cell * scale
+
+
+def strided_axis(axis, s):
+    # Un point sur s, extrémité incluse (les pas 2^p successifs s'emboîtent)
+    axis = np.asarray(axis, dtype=float)
+    idx = np.arange(0, len(axis), s)
+    if idx.size and idx[-1] != len(axis) - 1:
+        idx = np.append(idx, len(axis) - 1)
+    return axis[idx]
+
+
+def plan_grid(
+    gammas,
+    ks,
+    t_points=800,
+    mode="sampled",
+    backend=None,
+    budget=None,
+    policy=None,
+    channels=False,
+    max_cells=None,
+):
+    # Renvoie (gammas, ks, pas, estimation) respectant le budget et le plafond
+    budget = sweep_budget() if budget is None else float(budget)
+    max_cells = sweep_max_cells() if max_cells is None else int(max_cells)
+    policy = policy or budget_policy()
+    cells = len(gammas) * len(ks)
+    est = estimate_seconds(cells, t_points, mode, backend, channels)
+    if est <= budget and cells <= max_cells:
+        return gammas, ks, 1, est
+    if policy == "refuse":
+        if cells > max_cells:
+            raise BudgetExceeded(
+                f"Grille trop vaste : {cells} cellules (plafond {max_cells})."
+            )
+        raise BudgetExceeded(
+            f"Grille trop coûteuse : ~{est:.0f} s estimées (budget {budget:.0f} s)."
+        )
+    # Pas commun aux deux axes ; coût et cellules décroissent en ~1/s²
+    s = max(2, int(np.ceil(np.sqrt(max(est / budget, cells / max_cells)))))
+    while True:
+        g, k = strided_axis(gammas, s), strided_axis(ks, s)
+        cells = len(g) * len(k)
+        est = estimate_seconds(cells, t_points, mode, backend, channels)
+        if (est <= budget and cells <= max_cells) or (len(g) <= 2 and len(k) <= 2):
+            return g, k, s, est
+        s += 1
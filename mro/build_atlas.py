@@ -0,0 +1,22 @@
+import argparse
+import os
+
+from .atlas import DEFAULT_ATLAS_PATH, DEFAULT_AXES, build_atlas
+
+
+# Étape de build : python -m mro.build_atlas [--out chemin] [--gamma-step ...]
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit l'atlas (m, γ, k) du MRO.")
+    parser.add_argument("--out", default=os.environ.get("MRO_ATLAS", DEFAULT_ATLAS_PATH))
+    parser.add_argument("--gamma-step", type=float, default=DEFAULT_AXES["gamma"][2])
+    parser.add_argument("--k-step", type=float, default=DEFAULT_AXES["k"][2])
+    args = parser.parse_args()
+    axes = dict(DEFAULT_AXES)
+    axes["gamma"] = DEFAULT_AXES["gamma"][:2] + (args.gamma_step,)
+    axes["k"] = DEFAULT_AXES["k"][:2] + (args.k_step,)
+    print(build_atlas(args.out, axes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import numpy as np
+
+from .analytic import broadcast_params, flat_params, tanh_root
+from .batch import chunk_cells
+from .metrics import peak_metrics
+
+
+# ===========================
+#   Balayage multi-métriques (une passe, plusieurs canaux)
+# ===========================
+#
+# Chaque cellule (γ, k) n'est évaluée qu'une fois pour tout un jeu de canaux :
+# en analytique, les intermédiaires (β, ω0², q) sont partagés, et max |x|,
+# stabilisation et demi-vie découlent de (max_amp, decay_time), que la table
+# ζ ou l'atlas fournissent en mode "table" ; en mode
+# échantillonné, une seule trajectoire par cellule alimente tous les canaux
+# qui en dépendent. Le résultat est une grille multi-canal (C, cellules).
+
+CHANNELS = (
+    "max_amp",
+    "settling_time",
+    "log_decrement",
+    "energy_half_life",
+    "dominant_freq",
+    "q_factor",
+    "zero_crossings",
+)
+
+CHANNEL_LABELS = {
+    "max_amp": "Max |x(t)|",
+    "settling_time": "Temps de stabilisation (2 %)",
+    "log_decrement": "Décrément logarithmique",
+    "energy_half_life": "Demi-vie de l'énergie",
+    "dominant_freq": "Fréquence dominante",
+    "q_factor": "Facteur de qualité Q",
+    "zero_crossings": "Passages par zéro",
+}
+
+# Bande de stabilisation, relative à max |x|
+SETTLING_TOL = 0.02
+
+
+def check_channels(channels):
+    unknown = [c for c in channels if c not in CHANNELS]
+    if unknown or not channels:
+        raise ValueError(f"Canaux inconnus : {unknown!r} (attendu : {', '.join(CHANNELS)})")
+    return tuple(channels)
+
+
+def _parameter_channels(m, gamma, k):
+    # Canaux qui ne dépendent que de (m, γ, k)
+    beta = gamma / (2.0 * m)
+    w0sq = k / m
+    q = w0sq - beta * beta
+    under = q > 0
+    wd = np.sqrt(np.where(under, q, 1.0))
+    w0 = np.sqrt(w0sq)
+    return {
+        "log_decrement": np.where(under, 2.0 * np.pi * beta / wd, np.nan),
+        "dominant_freq": np.where(under, wd / (2.0 * np.pi), 0.0),
+        "q_factor": np.divide(
+            w0, 2.0 * beta, out=np.where(w0 > 0, np.inf, np.nan), where=beta > 0
+        ),
+    }
+
+
+def _analytic_zero_crossings(m, gamma, k, x0, v0, t_end):
+    # x = R·e^{-βt}·cos(ωd·t − φ) en sous-amorti ; au plus un zéro sinon
+    beta = gamma / (2.0 * m)
+    w0sq = k / m
+    q = w0sq - beta * beta
+    under = q > 0
+    B = v0 + beta * x0
+
+    wd = np.sqrt(np.where(under, q, 1.0))
+    a = np.arctan2(B / wd, x0) + np.pi / 2.0
+    span = wd * np.where(np.isfinite(t_end), t_end, 0.0)
+    n_min = np.floor(-a / np.pi) + 1.0
+    n_max = np.floor((span - a) / np.pi)
+    count_under = np.where(np.isfinite(t_end), np.maximum(n_max - n_min + 1.0, 0.0), np.inf)
+
+    # x = e^{-βt}(x0·cosh(st) + B·sinh(st)/s) : tanh(st) = −x0·s/B
+    s = np.sqrt(np.where(under, 0.0, -q))
+    t_zero = tanh_root(-x0, B, s, ~under)
+    count_over = (t_zero <= t_end).astype(float)
+    return np.where(under, count_under, count_over)
+
+
+def analytic_channels(m, gamma, k, x0=1.0, v0=0.0, t_end=np.inf, channels=CHANNELS, peaks=None):
+    # Grille (C, *forme) : formes closes, sans trajectoire. peaks : max_amp et
+    # decay_time déjà connus (table ζ, atlas), sinon calculés par mro.metrics
+    m, gamma, k, x0, v0, t_end = broadcast_params(m, gamma, k, x0, v0, t_end)
+    if peaks is None:
+        peaks = peak_metrics(m, gamma, k, x0=x0, v0=v0, t_end=t_end)
+    out = _parameter_channels(m, gamma, k)
+    out["max_amp"] = peaks["max_amp"]
+    # Approximation classique : l'enveloppe e^{-t/τ} passe sous la bande à ln(1/tol)·τ
+    out["settling_time"] = -np.log(SETTLING_TOL) * peaks["decay_time"]
+    # Énergie ∝ e^{-2t/τ}
+    out["energy_half_life"] = 0.5 * np.log(2.0) * peaks["decay_time"]
+    if "zero_crossings" in channels:
+        out["zero_crossings"] = _analytic_zero_crossings(m, gamma, k, x0, v0, t_end)
+    return np.stack([out[c] for c in channels])
+
+
+def _trajectory_channels(t, X, V, m, gamma, k, channels):
+    # Canaux mesurés sur les échantillons X, V (cellules, t_points)
+    out = {}
+    absx = np.abs(X)
+    max_amp = absx.max(axis=1)
+    out["max_amp"] = max_amp
+    if "settling_time" in channels:
+        # Dernier échantillon hors bande ; stabilisé après lui
+        outside = absx > SETTLING_TOL * max_amp[:, None]
+        last = X.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+        idx = np.minimum(last + 1, X.shape[1] - 1)
+        settled = np.where(outside[:, -1], np.inf, t[idx])
+        out["settling_time"] = np.where(outside.any(axis=1), settled, 0.0)
+    if "energy_half_life" in channels:
+        E = 0.5 * m[:, None] * V**2 + 0.5 * k[:, None] * X**2
+        below = E <= 0.5 * E[:, :1]
+        first = np.argmax(below, axis=1)
+        out["energy_half_life"] = np.where(below.any(axis=1), t[first] - t[0], np.inf)
+    if "zero_crossings" in channels:
+        sx = np.sign(X)
+        out["zero_crossings"] = np.count_nonzero(sx[:, 1:] * sx[:, :-1] < 0, axis=1).astype(float)
+    if "dominant_freq" in channels:
+        # Pic du spectre affiné par interpolation parabolique (log-amplitude) ;
+        # pic sur la première raie = pas d'oscillation résolue sur la fenêtre.
+        # Trajectoire constante (k = 0, équilibre) : spectre d'arrondis, 0 Hz
+        spec = np.abs(np.fft.rfft(X - X.mean(axis=1, keepdims=True), axis=1))
+        df = 1.0 / (t[-1] - t[0]) * (len(t) - 1) / len(t) if len(t) > 1 else 0.0
+        spec[:, 0] = 0.0
+        i = np.argmax(spec, axis=1)
+        rows = np.arange(spec.shape[0])
+        inner = (i > 1) & (i < spec.shape[1] - 1)
+        ic = np.clip(i, 1, spec.shape[1] - 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a, b, c = (np.log(spec[rows, ic + d]) for d in (-1, 0, 1))
+            shift = 0.5 * (a - c) / (a - 2.0 * b + c)
+        shift = np.where(inner & np.isfinite(shift), np.clip(shift, -0.5, 0.5), 0.0)
+        # (|FFT| ≤ N·max |x| ; seuil relatif, sans x² qui sous-déborde)
+        flat = spec.max(axis=1) <= 1e-10 * X.shape[1] * max_amp
+        out["dominant_freq"] = np.where((i > 1) & ~flat, (i + shift) * df, 0.0)
+    return out
+
+
+def sampled_channels(
+    simulate_batch,
+    m,
+    gamma,
+    k,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=800,
+    channels=CHANNELS,
+    **options,
+):
+    # simulate_batch : fonction batch d'un backend (voir core.BACKENDS).
+    # Une trajectoire par cellule, par blocs bornés en mémoire.
+    shape, (m, gamma, k, x0, v0) = flat_params(m, gamma, k, x0, v0)
+    params = _parameter_channels(m, gamma, k)
+
+    out = np.empty((len(channels), m.size))
+    step = chunk_cells(t_points)
+    for lo in range(0, m.size, step):
+        sl = slice(lo, lo + step)
+        t, X, V = simulate_batch(
+            m[sl], gamma[sl], k[sl], x0[sl], v0[sl], 0.0, t_end, t_points, **options
+        )
+        measured = _trajectory_channels(
+            np.asarray(t), np.asarray(X), np.asarray(V), m[sl], gamma[sl], k[sl], channels
+        )
+        for i, c in enumerate(channels):
+            out[i, sl] = measured[c] if c in measured else params[c][sl]
+    return out.reshape((len(channels),) + shape)
@@ -0,0 +1,439 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from .analytic import analytic_state, flat_params, simulate_analytic
+from .atlas import get_atlas
+from .batch import batch_max_amp
+from .channels import CHANNELS, analytic_channels, check_channels, sampled_channels
+from .jit import batch_max_amp_numba, simulate_numba, simulate_numba_batch
+from .memo import LRUCache, freeze, make_key
+from .metrics import METRICS, peak_metrics
+from .parallel import parallel_cells, should_parallelize
+from .propagator import (
+    batch_max_amp_propagator,
+    simulate_propagator,
+    simulate_propagator_batch,
+)
+from .reduced import zeta_table
+from .sharedcache import shared_cache_from_env
+from .tiles import TileStore
+
+
+# ===========================
+#   Noyau de simulation partagé
+# ===========================
+#
+# Point d'entrée unique pour app.py et toutes les pages. Le backend se
+# choisit par appel (backend="...") ou globalement via MRO_BACKEND.
+
+DEFAULT_BACKEND = "analytic"
+
+
+def MRO_equations(t, Y, m, gamma, k):
+    x, dxdt = Y
+    dxdtt = -(gamma / m) * dxdt - (k / m) * x
+    return [dxdt, dxdtt]
+
+
+# --- Backend scipy (référence numérique) ---
+
+def simulate_scipy(
+    m=1.0,
+    gamma=0.15,
+    k=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+    method="RK45",
+):
+    t_eval = np.linspace(t_start, t_end, t_points)
+    sol = solve_ivp(
+        MRO_equations,
+        [t_start, t_end],
+        [x0, v0],
+        args=(m, gamma, k),
+        t_eval=t_eval,
+        method=method,
+    )
+    return sol.t, sol.y[0], sol.y[1]
+
+
+def _scipy_batch(m, gamma, k, x0, v0, t_start, t_end, t_points, **options):
+    shape, flat = flat_params(m, gamma, k, x0, v0)
+    X = np.empty((flat[0].shape[0], t_points))
+    V = np.empty_like(X)
+    for j in range(X.shape[0]):
+        _, X[j], V[j] = simulate_scipy(
+            *(p[j] for p in flat), t_start, t_end, t_points, **options
+        )
+    t = np.linspace(t_start, t_end, t_points)
+    return t, X.reshape(shape + (t_points,)), V.reshape(shape + (t_points,))
+
+
+def _scipy_max_amp(m, gamma, k, x0, v0, t_end, t_points, **options):
+    _, X, _ = _scipy_batch(m, gamma, k, x0, v0, 0.0, t_end, t_points, **options)
+    return np.max(np.abs(X), axis=-1)
+
+
+# --- Backend analytique ---
+
+def _analytic_batch(m, gamma, k, x0, v0, t_start, t_end, t_points):
+    t = np.linspace(t_start, t_end, t_points)
+    params = [np.asarray(p, dtype=float)[..., None] for p in (m, gamma, k, x0, v0)]
+    X, V = analytic_state(t - t_start, *params)
+    return t, X, V
+
+
+def _analytic_max_amp(m, gamma, k, x0, v0, t_end, t_points):
+    return batch_max_amp(m, gamma, k, x0=x0, v0=v0, t_end=t_end, t_points=t_points)
+
+
+# --- Backend numba ---
+
+def _numba_batch(m, gamma, k, x0, v0, t_start, t_end, t_points, substeps=4):
+    return simulate_numba_batch(m, gamma, k, x0, v0, t_start, t_end, t_points, substeps)
+
+
+def _numba_max_amp(m, gamma, k, x0, v0, t_end, t_points, substeps=4):
+    return batch_max_amp_numba(m, gamma, k, x0, v0, t_end, t_points, substeps)
+
+
+# ===========================
+#   Registre des backends
+# ===========================
+
+BACKENDS = {}
+
+
+def register_backend(name, simulate, simulate_batch, max_amp):
+    BACKENDS[name] = {
+        "simulate": simulate,
+        "simulate_batch": simulate_batch,
+        "max_amp": max_amp,
+    }
+
+
+register_backend("analytic", simulate_analytic, _analytic_batch, _analytic_max_amp)
+register_backend("numba", simulate_numba, _numba_batch, _numba_max_amp)
+register_backend("scipy", simulate_scipy, _scipy_batch, _scipy_max_amp)
+register_backend(
+    "propagator", simulate_propagator, simulate_propagator_batch, batch_max_amp_propagator
+)
+
+
+def default_backend():
+    return os.environ.get("MRO_BACKEND", DEFAULT_BACKEND)
+
+
+def get_backend(name=None):
+    name = name or default_backend()
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Backend inconnu : {name!r} (disponibles : {', '.join(sorted(BACKENDS))})"
+        ) from None
+
+
+# ===========================
+#   Cache des résultats (LRU par worker + SQLite partagé)
+# ===========================
+
+# Taille maximale en octets (64 Mio par défaut, MRO_CACHE_BYTES pour ajuster)
+RESULT_CACHE = LRUCache(int(os.environ.get("MRO_CACHE_BYTES", 64 * 2**20)))
+
+# Cache disque commun à tous les workers de l'hôte (voir mro.sharedcache)
+SHARED_CACHE = shared_cache_from_env()
+
+# Seuls les résultats ayant coûté plus que ce temps de calcul vont sur disque :
+# une trajectoire analytique (< 1 ms) se recalcule plus vite qu'elle ne se lit.
+SHARED_MIN_SECONDS = float(os.environ.get("MRO_SHARED_MIN_MS", 5.0)) / 1000.0
+
+
+def recall(key):
+    # Résultat déjà calculé (mémoire du worker puis cache partagé), sinon None
+    hit = RESULT_CACHE.get(key)
+    if hit is None and SHARED_CACHE is not None:
+        hit = SHARED_CACHE.get(key)
+        if hit is not None:
+            hit = RESULT_CACHE.put(key, freeze(hit))
+    return hit
+
+
+def remember(key, value):
+    # Dépose un résultat assemblé hors de _cached (ex. grille calculée par
+    # blocs dans une tâche de fond) pour les autres processus
+    value = freeze(value)
+    RESULT_CACHE.put(key, value)
+    if SHARED_CACHE is not None:
+        SHARED_CACHE.put(key, value)
+    return value
+
+
+def store_grid(gammas, ks, Z, **params):
+    # Grille affichée (axes + valeurs), déposée pour d'autres callbacks ou
+    # processus (changement de canal, export ZIP) ; renvoie son jeton
+    gammas = np.asarray(gammas, dtype=float)
+    ks = np.asarray(ks, dtype=float)
+    token = hashlib.blake2b(
+        repr(make_key("grid", gammas, ks, params)).encode(), digest_size=16
+    ).hexdigest()
+    remember(("grid", token), (gammas, ks, np.asarray(Z)))
+    return token
+
+
+def load_grid(token):
+    # (gammas, ks, Z) déposés par store_grid, ou None (évincés / autre hôte)
+    if not token:
+        return None
+    return recall(("grid", token))
+
+
+def _cached(key, compute):
+    hit = recall(key)
+    if hit is not None:
+        return hit
+
+    start = time.perf_counter()
+    result = freeze(compute())
+    elapsed = time.perf_counter() - start
+    RESULT_CACHE.put(key, result)
+    if SHARED_CACHE is not None and elapsed >= SHARED_MIN_SECONDS:
+        SHARED_CACHE.put(key, result)
+    return result
+
+
+# Cellules (γ, k) déjà calculées, réutilisées d'une grille à l'autre (et,
+# via le cache partagé, d'un processus de tâche de fond au suivant)
+TILE_STORE = TileStore(shared=SHARED_CACHE)
+
+
+def cache_stats():
+    return {
+        "tiles": TILE_STORE.stats(),
+        "memory": RESULT_CACHE.stats(),
+        "shared": SHARED_CACHE.stats() if SHARED_CACHE is not None else None,
+    }
+
+
+# ===========================
+#   API publique
+# ===========================
+
+def simulate(
+    m=1.0,
+    gamma=0.15,
+    k=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+    backend=None,
+    **options,
+):
+    # options : paramètres propres au backend (method= pour scipy, substeps= pour numba)
+    backend = backend or default_backend()
+    key = make_key(
+        "simulate", m, gamma, k, x0, v0, t_start, t_end, t_points, backend, options
+    )
+
+    def compute():
+        result = get_backend(backend)["simulate"](
+            m=m,
+            gamma=gamma,
+            k=k,
+            x0=x0,
+            v0=v0,
+            t_start=t_start,
+            t_end=t_end,
+            t_points=t_points,
+            **options,
+        )
+        return tuple(np.asarray(r) for r in result)
+
+    return _cached(key, compute)
+
+
+def simulate_batch(
+    m,
+    gamma,
+    k,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+    backend=None,
+    **options,
+):
+    # Paramètres diffusés ensemble ; renvoie t (t_points,), X et V (*forme, t_points)
+    return get_backend(backend)["simulate_batch"](
+        m, gamma, k, x0, v0, t_start, t_end, t_points, **options
+    )
+
+
+SWEEP_MODES = ("sampled", "exact", "table")
+
+
+def sweep_cells(G, K, metric, m, x0, v0, t_end, t_points, mode, backend, options):
+    # Métrique sur des cellules (γ, k) quelconques, sans cache
+    if metric not in METRICS:
+        # Canal du moteur multi-métriques (mro.channels)
+        return channel_cells(G, K, (metric,), m, x0, v0, t_end, t_points, mode, backend, options)[:, 0]
+    if mode == "exact":
+        return peak_metrics(m, G, K, x0=x0, v0=v0, t_end=t_end)[metric]
+    if mode == "table":
+        return zeta_table().lookup(m, G, K, x0=x0, v0=v0, t_end=t_end)[metric]
+    return get_backend(backend)["max_amp"](m, G, K, x0, v0, t_end, t_points, **options)
+
+
+def sweep_metric(
+    gammas,
+    ks,
+    metric="max_amp",
+    m=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=2000,
+    mode="sampled",
+    backend=None,
+    **options,
+):
+    # Grille (len(gammas), len(ks)).
+    #   "sampled" : max|x| sur t_points échantillons du backend choisi
+    #   "exact"   : métriques analytiques (mro.metrics), sans trajectoire
+    #   "table"   : réduction adimensionnelle par table ζ (mro.reduced)
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Mode inconnu : {mode!r} (attendu : {', '.join(SWEEP_MODES)})")
+    if metric not in METRICS:
+        raise ValueError(f"Métrique inconnue : {metric!r} (attendu : {', '.join(METRICS)})")
+
+    if mode == "sampled" and metric != "max_amp":
+        raise ValueError("Le mode 'sampled' ne calcule que max_amp.")
+
+    gammas = np.asarray(gammas, dtype=float)
+    ks = np.asarray(ks, dtype=float)
+    backend = backend or default_backend()
+    # t_points et backend n'influencent que le mode échantillonné
+    sampling = (t_points, backend, options) if mode == "sampled" else None
+    key = make_key("sweep", gammas, ks, metric, m, x0, v0, t_end, mode, sampling)
+
+    spec = dict(
+        metric=metric, m=m, x0=x0, v0=v0, t_end=t_end, t_points=t_points,
+        mode=mode, backend=backend, options=options,
+    )
+
+    def compute_cells(G, K):
+        # Gros lots répartis sur le pool de processus (mro.parallel)
+        samples = t_points if mode == "sampled" else 1
+        if should_parallelize(G.size, samples):
+            return parallel_cells(G, K, spec)
+        return sweep_cells(G, K, **spec)
+
+    def compute():
+        # Atlas précalculé (memmap float32) : mode "table" seulement, et pour
+        # une grille posée sur ses nœuds (l'interpolation entre nœuds mélange
+        # les branches de part et d'autre de la courbe critique, moins précise
+        # que la table ζ). Sinon seules les cellules jamais vues sont calculées
+        atlas = get_atlas() if mode == "table" else None
+        if atlas is not None:
+            Z = atlas.lookup(metric, m, gammas, ks, x0=x0, v0=v0, interpolate=False)
+            if Z is not None:
+                return Z
+        return TILE_STORE.assemble(key[3:], gammas, ks, compute_cells)
+
+    return _cached(key, compute)
+
+
+# Cellules par bloc des formes closes multi-canal : la vingtaine
+# d'intermédiaires d'un bloc reste en cache, d'où un coût par cellule stable
+# (un lot unique de 10⁶ cellules coûte ~1,5× plus par cellule)
+CHANNEL_BLOCK = 32768
+
+
+def channel_cells(G, K, channels, m, x0, v0, t_end, t_points, mode, backend, options):
+    # Canaux sur des cellules (γ, k) quelconques (tableaux plats), sans cache ;
+    # forme (n, C)
+    if mode == "sampled":
+        simulate_batch = get_backend(backend)["simulate_batch"]
+        Z = sampled_channels(simulate_batch, m, G, K, x0, v0, t_end, t_points, channels, **options)
+        return Z.T
+    out = np.empty((np.size(G), len(channels)))
+    for lo in range(0, out.shape[0], CHANNEL_BLOCK):
+        g, k = G[lo:lo + CHANNEL_BLOCK], K[lo:lo + CHANNEL_BLOCK]
+        peaks = zeta_table().lookup(m, g, k, x0=x0, v0=v0, t_end=t_end) if mode == "table" else None
+        Z = analytic_channels(m, g, k, x0=x0, v0=v0, t_end=t_end, channels=channels, peaks=peaks)
+        out[lo:lo + CHANNEL_BLOCK] = Z.T
+    return out
+
+
+def _atlas_channels(gammas, ks, channels, m, x0, v0, t_end):
+    # Grille posée sur les nœuds de l'atlas : max_amp et decay_time lus, le
+    # reste en forme close ; None sinon
+    atlas = get_atlas()
+    if atlas is None:
+        return None
+    peaks = {}
+    for metric in ("max_amp", "decay_time"):
+        peaks[metric] = atlas.lookup(metric, m, gammas, ks, x0=x0, v0=v0, interpolate=False)
+        if peaks[metric] is None:
+            return None
+    G, K = np.meshgrid(gammas, ks, indexing="ij")
+    return analytic_channels(m, G, K, x0=x0, v0=v0, t_end=t_end, channels=channels, peaks=peaks)
+
+
+def sweep_channels(
+    gammas,
+    ks,
+    channels=CHANNELS,
+    m=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=800,
+    mode="exact",
+    backend=None,
+    **options,
+):
+    # Grille multi-canal (C, len(gammas), len(ks)) calculée en une passe :
+    #   "sampled" : une trajectoire par cellule pour tous les canaux
+    #   "exact"   : formes closes (mro.channels), sans trajectoire
+    #   "table"   : idem, max |x| et constante de temps lus dans l'atlas
+    #               (grille sur ses nœuds) ou la table ζ
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Mode inconnu : {mode!r} (attendu : {', '.join(SWEEP_MODES)})")
+    channels = check_channels(channels)
+    gammas = np.asarray(gammas, dtype=float)
+    ks = np.asarray(ks, dtype=float)
+    backend = backend or default_backend()
+    sampling = (t_points, backend, options) if mode == "sampled" else None
+    key = make_key("channels", gammas, ks, channels, m, x0, v0, t_end, mode, sampling)
+
+    spec = dict(
+        channels=channels, m=m, x0=x0, v0=v0, t_end=t_end, t_points=t_points,
+        mode=mode, backend=backend, options=options,
+    )
+
+    def compute_cells(G, K):
+        samples = t_points if mode == "sampled" else 1
+        if should_parallelize(G.size, samples):
+            return parallel_cells(G, K, spec, width=len(channels), fn="channel_cells")
+        return channel_cells(G, K, **spec)
+
+    def compute():
+        if mode == "table":
+            Z = _atlas_channels(gammas, ks, channels, m, x0, v0, t_end)
+            if Z is not None:
+                return Z
+        Z = TILE_STORE.assemble(key[3:], gammas, ks, compute_cells)
+        return np.ascontiguousarray(np.moveaxis(Z, -1, 0))
+
+    return _cached(key, compute)
@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+
+from .jit import njit
+
+
+# ===========================
+#   Décimation des séries affichées
+# ===========================
+#
+# Un graphe ne montre qu'environ un point par pixel horizontal : au-delà, les
+# échantillons alourdissent le JSON et le rendu sans rien changer à l'image.
+# LTTB (Largest-Triangle-Three-Buckets) garde dans chaque seau le point qui
+# forme le plus grand triangle avec son voisin retenu et la moyenne du seau
+# suivant : pics et passages par zéro sont conservés. Les fonctions renvoient
+# des indices, partagés entre les séries d'une même trajectoire.
+#
+#   MRO_PLOT_POINTS   points par trace et par fenêtre (1000 par défaut)
+
+
+def plot_points():
+    return max(3, int(os.environ.get("MRO_PLOT_POINTS", 1000)))
+
+
+@njit(cache=True)
+def _lttb(x, y, n_out, out):
+    n = x.shape[0]
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    out[0] = 0
+    for i in range(n_out - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # Moyenne du seau suivant (le dernier point pour le dernier seau)
+        nlo = hi
+        nhi = min(int((i + 2) * every) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(nlo, nhi):
+            avg_x += x[j]
+            avg_y += y[j]
+        avg_x /= nhi - nlo
+        avg_y /= nhi - nlo
+        best = -1.0
+        pick = lo
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best:
+                best = area
+                pick = j
+        out[i + 1] = pick
+        a = pick
+    out[n_out - 1] = n - 1
+
+
+def lttb_indices(x, y, n_out=None):
+    x = np.ascontiguousarray(x, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    n_out = plot_points() if n_out is None else max(3, int(n_out))
+    if x.shape[0] <= n_out:
+        return np.arange(x.shape[0])
+    out = np.empty(n_out, dtype=np.int64)
+    _lttb(x, y, n_out, out)
+    return out
+
+
+def minmax_indices(y, n_buckets):
+    # Min et max de chaque seau (indices triés, extrémités incluses)
+    y = np.asarray(y, dtype=float)
+    n = y.shape[0]
+    bucket = max(1, -(-n // max(int(n_buckets), 1)))
+    if bucket == 1:
+        return np.arange(n)
+    pad = -n % bucket
+    yb = np.pad(y, (0, pad), mode="edge").reshape(-1, bucket)
+    starts = np.arange(0, n, bucket)
+    picks = np.concatenate([starts + np.argmin(yb, axis=1), starts + np.argmax(yb, axis=1), [0, n - 1]])
+    return np.unique(np.minimum(picks, n - 1))
+
+
+def window_slice(t, window):
+    # Tranche de t couvrant [t0, t1], un échantillon de marge de chaque côté
+    if window is None:
+        return slice(None)
+    t0, t1 = sorted(window)
+    i0 = max(int(np.searchsorted(t, t0)) - 1, 0)
+    i1 = min(int(np.searchsorted(t, t1)) + 1, len(t))
+    return slice(i0, i1)
+
+
+def decimate_indices(t, y, n_out=None, window=None):
+    # LTTB sur toute la série ; la fenêtre zoomée (t0, t1) est ajoutée à sa
+    # propre résolution (pleine résolution si elle compte ≤ n_out échantillons),
+    # le reste de la courbe restant visible en arrière-plan pour le panoramique
+    idx = lttb_indices(t, y, n_out)
+    if window is None:
+        return idx
+    sl = window_slice(t, window)
+    start = sl.start or 0
+    inner = start + lttb_indices(t[sl], y[sl], n_out)
+    return np.union1d(idx, inner)
+
+
+def curve_indices(x, y, n_out=None):
+    # Courbe paramétrée (espace des phases) : extrêmes de chaque composante,
+    # donc chaque tour de spirale garde ses points de rebroussement
+    n_out = plot_points() if n_out is None else int(n_out)
+    if len(x) <= n_out:
+        return np.arange(len(x))
+    return np.union1d(minmax_indices(x, n_out // 4), minmax_indices(y, n_out // 4))
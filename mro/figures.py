@@ -0,0 +1,66 @@
+import plotly.graph_objects as go
+
+
+# ===========================
+#   Figures plotly en dict (sans validation graph_objects)
+# ===========================
+#
+# go.Figure / add_trace / update_layout valident chaque attribut : plusieurs
+# ms par figure, autant que la simulation elle-même. Les callbacks
+# construisent donc des spécifications plotly en dict, envoyées telles
+# quelles au navigateur. Le template mro_lab y est inclus déjà résolu (validé
+# une seule fois, à l'import) ; go.Figure ne sert plus qu'à l'export kaleido.
+
+MRO_LAB_LAYOUT = dict(
+    font=dict(family="system-ui, -apple-system, BlinkMacSystemFont, 'SF Pro Text', sans-serif", size=14, color="#111827"),
+    paper_bgcolor="#f7f7f8",
+    plot_bgcolor="#ffffff",
+    xaxis=dict(gridcolor="#e5e7eb", zerolinecolor="#e5e7eb", linecolor="#9ca3af", ticks="outside"),
+    yaxis=dict(gridcolor="#e5e7eb", zerolinecolor="#e5e7eb", linecolor="#9ca3af", ticks="outside"),
+    colorway=[
+        "#0d6efd",  # primary
+        "#16a085",
+        "#8e44ad",
+        "#e67e22",
+        "#2c3e50",
+        "#d35400",
+    ],
+    legend=dict(bgcolor="#ffffff", bordercolor="#e5e7eb", borderwidth=1),
+    margin=dict(l=60, r=30, t=50, b=60),
+)
+
+# Partagé par toutes les figures : ne jamais le modifier en place
+MRO_LAB_TEMPLATE = go.layout.Template(layout=MRO_LAB_LAYOUT).to_plotly_json()
+
+
+def line(x, y, name, **attrs):
+    return {"type": "scatter", "mode": "lines", "x": x, "y": y, "name": name, **attrs}
+
+
+def _axis(title, grid):
+    axis = {"title": {"text": title}}
+    if grid:
+        axis["showgrid"] = True
+    return axis
+
+
+def figure(data, title, xaxis_title=None, yaxis_title=None, grid=False, **layout):
+    return {
+        "data": list(data),
+        "layout": {
+            "template": MRO_LAB_TEMPLATE,
+            "title": {"text": title},
+            "xaxis": _axis(xaxis_title, grid),
+            "yaxis": _axis(yaxis_title, grid),
+            **layout,
+        },
+    }
+
+
+def vline(x, text=None, dash="dash"):
+    # Équivalent de Figure.add_vline(annotation_position="top") : (forme, annotation)
+    shape = {"type": "line", "xref": "x", "yref": "y domain", "x0": x, "x1": x,
+             "y0": 0, "y1": 1, "line": {"dash": dash}}
+    annotation = {"text": text, "showarrow": False, "xref": "x", "yref": "y domain",
+                  "x": x, "y": 1, "xanchor": "center", "yanchor": "bottom"}
+    return shape, annotation
@@ -0,0 +1,140 @@
+import numpy as np
+
+from .analytic import flat_params
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba absent : mêmes noyaux, exécutés en Python pur
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+# ===========================
+#   Intégrateur RK4 à pas fixe (compilé)
+# ===========================
+#
+# cache=True : le code machine est écrit dans __pycache__ (ou NUMBA_CACHE_DIR),
+# les workers gunicorn suivants le rechargent sans recompiler.
+# _rhs est le seul endroit à modifier pour une variante non linéaire du MRO.
+
+
+@njit(cache=True, fastmath=True)
+def _rhs(x, v, m, gamma, k):
+    return v, -(gamma / m) * v - (k / m) * x
+
+
+@njit(cache=True, fastmath=True)
+def _rk4_step(x, v, h, m, gamma, k):
+    k1x, k1v = _rhs(x, v, m, gamma, k)
+    k2x, k2v = _rhs(x + 0.5 * h * k1x, v + 0.5 * h * k1v, m, gamma, k)
+    k3x, k3v = _rhs(x + 0.5 * h * k2x, v + 0.5 * h * k2v, m, gamma, k)
+    k4x, k4v = _rhs(x + h * k3x, v + h * k3v, m, gamma, k)
+    x_new = x + (h / 6.0) * (k1x + 2.0 * k2x + 2.0 * k3x + k4x)
+    v_new = v + (h / 6.0) * (k1v + 2.0 * k2v + 2.0 * k3v + k4v)
+    return x_new, v_new
+
+
+@njit(cache=True, fastmath=True)
+def _integrate(m, gamma, k, x0, v0, dt_out, t_points, substeps, xs, vs):
+    h = dt_out / substeps
+    x, v = x0, v0
+    xs[0] = x
+    vs[0] = v
+    for i in range(1, t_points):
+        for _ in range(substeps):
+            x, v = _rk4_step(x, v, h, m, gamma, k)
+        xs[i] = x
+        vs[i] = v
+
+
+@njit(cache=True, parallel=True)
+def _integrate_batch(m, gamma, k, x0, v0, dt_out, t_points, substeps, X, V):
+    for j in prange(m.shape[0]):
+        _integrate(m[j], gamma[j], k[j], x0[j], v0[j], dt_out, t_points, substeps, X[j], V[j])
+
+
+@njit(cache=True, parallel=True)
+def _max_amp_batch(m, gamma, k, x0, v0, dt_out, t_points, substeps, out):
+    # Réduction dans le noyau : aucune trajectoire n'est stockée
+    for j in prange(m.shape[0]):
+        h = dt_out / substeps
+        x, v = x0[j], v0[j]
+        peak = abs(x)
+        for _ in range(1, t_points):
+            for _s in range(substeps):
+                x, v = _rk4_step(x, v, h, m[j], gamma[j], k[j])
+            peak = max(peak, abs(x))
+        out[j] = peak
+
+
+def _dt_out(t_start, t_end, t_points):
+    return (float(t_end) - float(t_start)) / max(int(t_points) - 1, 1)
+
+
+def simulate_numba(
+    m=1.0,
+    gamma=0.15,
+    k=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+    substeps=4,
+):
+    t = np.linspace(t_start, t_end, t_points)
+    x = np.empty(t_points)
+    v = np.empty(t_points)
+    _integrate(
+        float(m), float(gamma), float(k), float(x0), float(v0),
+        _dt_out(t_start, t_end, t_points), int(t_points), int(substeps), x, v,
+    )
+    return t, x, v
+
+
+def simulate_numba_batch(
+    m,
+    gamma,
+    k,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+    substeps=4,
+):
+    # Renvoie t (t_points,) et X, V de forme (*params, t_points)
+    shape, params = flat_params(m, gamma, k, x0, v0)
+    params = [np.ascontiguousarray(p) for p in params]
+    n = params[0].shape[0]
+    t = np.linspace(t_start, t_end, t_points)
+    X = np.empty((n, t_points))
+    V = np.empty((n, t_points))
+    _integrate_batch(
+        *params, _dt_out(t_start, t_end, t_points), int(t_points), int(substeps), X, V
+    )
+    return t, X.reshape(shape + (t_points,)), V.reshape(shape + (t_points,))
+
+
+def batch_max_amp_numba(
+    m,
+    gamma,
+    k,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=2000,
+    substeps=4,
+):
+    shape, params = flat_params(m, gamma, k, x0, v0)
+    params = [np.ascontiguousarray(p) for p in params]
+    out = np.empty(params[0].shape[0])
+    _max_amp_batch(*params, _dt_out(0.0, t_end, t_points), int(t_points), int(substeps), out)
+    return out.reshape(shape)
@@ -0,0 +1,129 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# ===========================
+#   Mémoïsation LRU bornée en octets
+# ===========================
+#
+# Les clés sont quantifiées (12 chiffres significatifs) : deux appels dont les
+# paramètres ne diffèrent que par du bruit flottant (slider, round-trip JSON)
+# partagent le même résultat. Les tableaux renvoyés sont en lecture seule,
+# puisqu'ils sont partagés entre callbacks.
+
+QUANT_DIGITS = 12
+
+
+def quantize(value, digits=QUANT_DIGITS):
+    return float(f"{float(value):.{digits}g}")
+
+
+# Équivalent vectorisé pour les tableaux : arrondi de la mantisse à ~40 bits
+# (≈ 12 chiffres), puis empreinte des octets.
+_MANTISSA_DROP = np.uint64(12)
+
+
+def quantize_array(arr):
+    bits = np.ascontiguousarray(arr, dtype=np.float64).view(np.uint64)
+    half = np.uint64(1) << (_MANTISSA_DROP - np.uint64(1))
+    return ((bits + half) >> _MANTISSA_DROP) << _MANTISSA_DROP
+
+
+def _key_part(part):
+    if part is None or isinstance(part, (bool, str)):
+        return part
+    if isinstance(part, (int, float, np.integer, np.floating)):
+        return quantize(part)
+    if isinstance(part, np.ndarray):
+        digest = hashlib.blake2b(quantize_array(part).tobytes(), digest_size=16).hexdigest()
+        return ("array", part.shape, digest)
+    if isinstance(part, dict):
+        return tuple(sorted((k, _key_part(v)) for k, v in part.items()))
+    if isinstance(part, (list, tuple)):
+        return tuple(_key_part(p) for p in part)
+    return repr(part)
+
+
+def make_key(*parts):
+    return tuple(_key_part(p) for p in parts)
+
+
+def result_nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(result_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(result_nbytes(v) for v in value)
+    return 64
+
+
+def freeze(value):
+    # Rend les tableaux d'un résultat non modifiables (partagés via le cache)
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for v in value.values():
+            freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            freeze(v)
+    return value
+
+
+class LRUCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, _ = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = result_nbytes(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, old) = self._data.popitem(last=False)
+                self.bytes -= old
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,90 @@
+import numpy as np
+
+from .analytic import analytic_state, broadcast_params, tanh_root
+
+
+# ===========================
+#   Métriques analytiques (sans grille temporelle)
+# ===========================
+#
+# Pour γ ≥ 0, |x(t)| ne peut dépasser max(|x0|, |x(t1)|, |x(t_end)|) où t1 est
+# le premier zéro strictement positif de v(t) : en sous-amorti les extrema
+# successifs décroissent d'un facteur e^{-βπ/ωd}, en sur-amorti / critique il
+# y a au plus un extremum. Le pic est donc exact, pas limité par t_points.
+
+METRICS = ("max_amp", "peak_time", "peak_amp", "decay_time", "overshoot", "zeta")
+
+
+def _first_extremum_time(beta, w0sq, x0, v0):
+    # Premier t > 0 tel que v(t) = v0·Ec − A·Es = 0, avec A = ω0²·x0 + β·v0.
+    # np.inf quand v ne s'annule pas (mouvement monotone).
+    A = w0sq * x0 + beta * v0
+    q = w0sq - beta * beta
+    under = q > 0
+
+    # Sous-amorti : tan(ωd·t) = v0·ωd / A ; si v0 = 0, l'extremum suivant est à π/ωd
+    wd = np.sqrt(np.where(under, q, 1.0))
+    theta = np.mod(np.arctan2(v0 * wd, A), np.pi)
+    theta = np.where(theta > 0, theta, np.pi)
+
+    # Sur-amorti / critique : tanh(s·t) = v0·s / A
+    s = np.sqrt(np.where(under, 0.0, -q))
+    return np.where(under, theta / wd, tanh_root(v0, A, s, ~under))
+
+
+def peak_metrics(m, gamma, k, x0=1.0, v0=0.0, t_end=np.inf):
+    m, gamma, k, x0, v0, t_end = broadcast_params(m, gamma, k, x0, v0, t_end)
+    beta = gamma / (2.0 * m)
+    w0sq = k / m
+
+    t1 = _first_extremum_time(beta, w0sq, x0, v0)
+    finite = np.isfinite(t1)
+    x1, _ = analytic_state(np.where(finite, t1, 0.0), m, gamma, k, x0, v0)
+    peak_amp = np.where(finite, np.abs(x1), np.nan)
+
+    # max |x| sur [0, t_end] : bornes de l'intervalle + extremum s'il y tombe
+    horizon = np.isfinite(t_end)
+    x_end, _ = analytic_state(np.where(horizon, t_end, 0.0), m, gamma, k, x0, v0)
+    # Mouvement monotone sans horizon (k = 0) : limite x0 + v0/(2β)
+    beta_safe = np.where(beta > 0, beta, 1.0)
+    x_inf = np.where(beta > 0, x0 + v0 / (2.0 * beta_safe), np.where(v0 != 0, np.inf, x0))
+    x_end = np.where(horizon, x_end, np.where(w0sq > 0, 0.0, x_inf))
+    max_amp = np.maximum(np.abs(x0), np.abs(x_end))
+    in_window = finite & (t1 <= t_end)
+    max_amp = np.where(in_window, np.maximum(max_amp, np.abs(x1)), max_amp)
+
+    # Constante de temps du mode le plus lent (enveloppe e^{-t/τ})
+    q = w0sq - beta * beta
+    s = np.sqrt(np.where(q > 0, 0.0, -q))
+    fast = beta + s
+    slow = np.divide(w0sq, fast, out=np.zeros_like(fast), where=fast > 0)
+    rate = np.where(q > 0, beta, slow)
+    decay_time = np.divide(1.0, rate, out=np.full_like(rate, np.inf), where=rate > 0)
+
+    # Dépassement par demi-période : e^{-βπ/ωd}, nul hors sous-amorti
+    wd = np.sqrt(np.where(q > 0, q, 1.0))
+    overshoot = np.where(q > 0, np.exp(-np.pi * beta / wd), 0.0)
+
+    zeta = np.divide(
+        beta, np.sqrt(w0sq), out=np.full_like(beta, np.inf), where=w0sq > 0
+    )
+
+    return {
+        "max_amp": max_amp,
+        "peak_time": t1,
+        "peak_amp": peak_amp,
+        "decay_time": decay_time,
+        "overshoot": overshoot,
+        "zeta": zeta,
+    }
+
+
+def grid_metric(gammas, ks, metric="max_amp", m=1.0, x0=1.0, v0=0.0, t_end=30.0):
+    if metric not in METRICS:
+        raise ValueError(f"Métrique inconnue : {metric!r} (attendu : {', '.join(METRICS)})")
+    G, K = np.meshgrid(
+        np.asarray(gammas, dtype=float),
+        np.asarray(ks, dtype=float),
+        indexing="ij",
+    )
+    return peak_metrics(m, G, K, x0=x0, v0=v0, t_end=t_end)[metric]
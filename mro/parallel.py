@@ -0,0 +1,166 @@
+import atexit
+import multiprocessing as mp
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# ===========================
+#   Balayage parallèle (pool de processus persistant)
+# ===========================
+#
+# Les cellules à calculer (ordre ligne par ligne, donc blocs de lignes γ)
+# sont découpées en tranches contiguës. Entrées et sorties transitent par un
+# unique segment de mémoire partagée [γ | k | Z…] : les processus du pool
+# lisent leurs tranches et écrivent Z en place, rien n'est picklé hormis le
+# nom du segment et des bornes.
+#
+# Les tâches de fond Dash (DiskcacheManager) tournent dans un processus
+# jetable, tué avec ses enfants à l'annulation : un pool de processus n'y
+# survivrait pas à la tâche (forkserver, sémaphores et segments orphelins à
+# chaque calcul). On y répartit donc les tranches sur des threads du
+# processus de la tâche ; les noyaux NumPy relâchent le GIL.
+#
+#   MRO_POOL_SIZE        processus du pool par worker gunicorn
+#                        (défaut : cœurs / 3, 0 ou 1 = pas de pool)
+#   MRO_POOL_BUDGET      tranches simultanées par requête (défaut : taille du pool)
+#   MRO_PARALLEL_MIN     coût minimal (cellules × échantillons) pour paralléliser
+
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+_THREADS = None
+_THREADS_PID = None
+
+# Backends déjà parallèles dans leur noyau (prange numba) : appel direct
+# dans une tâche de fond, la couche de threads de numba n'étant pas réentrante
+_INTERNALLY_PARALLEL = ("numba",)
+
+
+def pool_size():
+    default = max(1, (os.cpu_count() or 1) // 3)
+    return max(0, int(os.environ.get("MRO_POOL_SIZE", default)))
+
+
+def request_budget():
+    return max(1, min(pool_size(), int(os.environ.get("MRO_POOL_BUDGET", pool_size()))))
+
+
+def parallel_min_cost():
+    return float(os.environ.get("MRO_PARALLEL_MIN", 2e6))
+
+
+def _context():
+    # forkserver : processus issus d'un serveur propre (pas de fork d'un
+    # worker multi-thread), avec le noyau numérique déjà importé
+    if "forkserver" in mp.get_all_start_methods():
+        ctx = mp.get_context("forkserver")
+        ctx.set_forkserver_preload(["mro.core"])
+        return ctx
+    return mp.get_context("spawn")
+
+
+def get_pool():
+    # Un pool par processus (recréé après le fork des workers gunicorn)
+    global _POOL, _POOL_PID
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = ProcessPoolExecutor(max_workers=pool_size(), mp_context=_context())
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def in_background_job():
+    # Processus lancé par multiprocess.Process (tâche de fond Dash)
+    jobs = sys.modules.get("multiprocess")
+    return jobs is not None and jobs.parent_process() is not None
+
+
+def get_threads():
+    global _THREADS, _THREADS_PID
+    with _POOL_LOCK:
+        if _THREADS is None or _THREADS_PID != os.getpid():
+            _THREADS = ThreadPoolExecutor(max_workers=pool_size(), thread_name_prefix="mro-sweep")
+            _THREADS_PID = os.getpid()
+        return _THREADS
+
+
+@atexit.register
+def shutdown_pool():
+    global _POOL
+    if _POOL is not None and _POOL_PID == os.getpid():
+        _POOL.shutdown(wait=False, cancel_futures=True)
+    _POOL = None
+
+
+def _run_shard(shm_name, n, width, lo, hi, fn, spec):
+    # Exécuté dans un processus du pool ; fn : moteur de cellules de mro.core
+    from . import core
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        buf = np.ndarray((2 + width, n), dtype=np.float64, buffer=shm.buf)
+        vals = getattr(core, fn)(G=buf[0, lo:hi], K=buf[1, lo:hi], **spec)
+        buf[2:, lo:hi] = np.asarray(vals, dtype=np.float64).reshape(hi - lo, width).T
+        del buf
+    finally:
+        shm.close()
+    return hi - lo
+
+
+def parallel_cells(G, K, spec, budget=None, width=1, fn="sweep_cells"):
+    # spec : arguments de core.<fn> hors (G, K) — doivent être picklables.
+    # Résultat (n,) ou (n, width) pour un moteur multi-canal.
+    G = np.ascontiguousarray(G, dtype=np.float64).ravel()
+    K = np.ascontiguousarray(K, dtype=np.float64).ravel()
+    n = G.size
+    shards = max(1, min(budget or request_budget(), n))
+    bounds = np.linspace(0, n, shards + 1).astype(int)
+    if in_background_job():
+        return _threaded_cells(G, K, spec, bounds, width, fn)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, (2 + width) * n * 8))
+    try:
+        buf = np.ndarray((2 + width, n), dtype=np.float64, buffer=shm.buf)
+        buf[0] = G
+        buf[1] = K
+        pool = get_pool()
+        futures = [
+            pool.submit(_run_shard, shm.name, n, width, int(lo), int(hi), fn, spec)
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+            if hi > lo
+        ]
+        for f in futures:
+            f.result()
+        out = buf[2:].T.copy() if width > 1 else buf[2].copy()
+        del buf
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
+
+
+def _threaded_cells(G, K, spec, bounds, width, fn):
+    from . import core
+
+    engine = getattr(core, fn)
+    if spec.get("mode") == "sampled" and spec.get("backend") in _INTERNALLY_PARALLEL:
+        bounds = bounds[[0, -1]]
+    out = np.empty((G.size, width))
+    pool = get_threads()
+    futures = [
+        (lo, hi, pool.submit(engine, G=G[lo:hi], K=K[lo:hi], **spec))
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+        if hi > lo
+    ]
+    for lo, hi, f in futures:
+        out[lo:hi] = np.asarray(f.result(), dtype=np.float64).reshape(hi - lo, width)
+    return out if width > 1 else out[:, 0]
+
+
+def should_parallelize(cells, samples_per_cell=1):
+    return pool_size() > 1 and cells * max(samples_per_cell, 1) >= parallel_min_cost()
@@ -0,0 +1,103 @@
+import numpy as np
+
+from .analytic import damped_basis, flat_params
+from .batch import DEFAULT_CHUNK_BYTES
+
+
+# ===========================
+#   Propagateur discret exact exp(A·Δt)
+# ===========================
+#
+# Sur une grille uniforme, l'état s = (x, v) vérifie s[n+1] = Φ·s[n] avec
+#     Φ = exp(A·Δt) = [[Ec + β·Es,  Es        ],
+#                      [−ω0²·Es,    Ec − β·Es ]]
+# (Ec, Es) étant la base amortie de mro.analytic évaluée en Δt : Φ est
+# exacte et calculée une seule fois par jeu de paramètres.
+
+
+def propagator_matrix(m, gamma, k, dt):
+    m = np.asarray(m, dtype=float)
+    beta = np.asarray(gamma, dtype=float) / (2.0 * m)
+    w0sq = np.asarray(k, dtype=float) / m
+    ec, es = damped_basis(dt, beta, w0sq)
+    beta, w0sq = np.broadcast_arrays(beta, w0sq)
+    beta = np.broadcast_to(beta, ec.shape)
+    w0sq = np.broadcast_to(w0sq, ec.shape)
+    phi = np.empty(ec.shape + (2, 2))
+    phi[..., 0, 0] = ec + beta * es
+    phi[..., 0, 1] = es
+    phi[..., 1, 0] = -w0sq * es
+    phi[..., 1, 1] = ec - beta * es
+    return phi
+
+
+def propagate(phi, state0, n_steps):
+    # Balayage par doublement : s[f + i] = Φ^f · s[i] pour i < f, puis Φ^f → Φ^{2f}.
+    # log2(n_steps) produits matriciels vectorisés au lieu de n_steps itérations.
+    phi = np.asarray(phi, dtype=float)
+    state0 = np.asarray(state0, dtype=float)
+    batch = np.broadcast_shapes(phi.shape[:-2], state0.shape[:-1])
+    S = np.empty(batch + (n_steps, 2))
+    if n_steps == 0:
+        return S
+    S[..., 0, :] = state0
+    P = np.broadcast_to(phi, batch + (2, 2))
+    filled = 1
+    while filled < n_steps:
+        take = min(filled, n_steps - filled)
+        # Produit 2×2 écrit composante par composante (plus rapide qu'einsum)
+        x, v = S[..., :take, 0], S[..., :take, 1]
+        S[..., filled:filled + take, 0] = P[..., 0, 0, None] * x + P[..., 0, 1, None] * v
+        S[..., filled:filled + take, 1] = P[..., 1, 0, None] * x + P[..., 1, 1, None] * v
+        filled += take
+        if filled < n_steps:
+            P = P @ P
+    return S
+
+
+def simulate_propagator(
+    m=1.0,
+    gamma=0.15,
+    k=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+):
+    t = np.linspace(t_start, t_end, t_points)
+    dt = (t_end - t_start) / max(t_points - 1, 1)
+    S = propagate(propagator_matrix(m, gamma, k, dt), [x0, v0], t_points)
+    return t, S[:, 0], S[:, 1]
+
+
+def simulate_propagator_batch(m, gamma, k, x0, v0, t_start, t_end, t_points):
+    shape, (m, gamma, k, x0, v0) = flat_params(m, gamma, k, x0, v0)
+    t = np.linspace(t_start, t_end, t_points)
+    dt = (t_end - t_start) / max(t_points - 1, 1)
+    S = propagate(propagator_matrix(m, gamma, k, dt), np.stack([x0, v0], axis=-1), t_points)
+    return t, S[..., 0].reshape(shape + (t_points,)), S[..., 1].reshape(shape + (t_points,))
+
+
+def batch_max_amp_propagator(
+    m,
+    gamma,
+    k,
+    x0=1.0,
+    v0=0.0,
+    t_end=30.0,
+    t_points=2000,
+    chunk_bytes=DEFAULT_CHUNK_BYTES,
+):
+    shape, (m, gamma, k, x0, v0) = flat_params(m, gamma, k, x0, v0)
+    dt = t_end / max(t_points - 1, 1)
+    phi = propagator_matrix(m, gamma, k, dt)
+    state0 = np.stack([x0, v0], axis=-1)
+    out = np.empty(m.shape[0])
+    # ~4 tableaux (cellules × t_points × 2) vivants pendant le balayage
+    step = max(1, int(chunk_bytes) // (4 * 16 * max(int(t_points), 1)))
+    for lo in range(0, m.shape[0], step):
+        sl = slice(lo, lo + step)
+        S = propagate(phi[sl], state0[sl], t_points)
+        out[sl] = np.max(np.abs(S[..., 0]), axis=-1)
+    return out.reshape(shape)
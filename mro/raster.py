@@ -0,0 +1,144 @@
+import base64
+import re
+import struct
+import zlib
+
+import numpy as np
+
+
+# ===========================
+#   Rendu raster des grandes grilles (γ, k)
+# ===========================
+#
+# Au-delà de quelques centaines de cellules par côté, envoyer Z (et les
+# maillages K, G) en JSON coûte des Mo et sature le navigateur. On réduit
+# d'abord la grille à la résolution d'affichage (moyenne par blocs, NaN
+# ignorés), puis on la quantifie sur 8 bits et on l'encode en PNG indexé :
+# la palette (PLTE) porte l'échelle de couleurs, le code NAN_CODE est
+# transparent (tRNS). Une carte lisse d'un million de cellules tient en
+# quelques dizaines de ko.
+
+# Codes 0..LEVELS-1 pour les valeurs, NAN_CODE pour NaN / ±inf
+LEVELS = 255
+NAN_CODE = 255
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def lod_factor(n, max_side):
+    # Taille de bloc telle que n / bloc ≤ max_side
+    return max(1, -(-int(n) // int(max_side)))
+
+
+def block_reduce(Z, fg, fk):
+    # Moyenne par blocs fg × fk des valeurs finies ; blocs de bord partiels
+    Z = np.asarray(Z, dtype=float)
+    if fg == 1 and fk == 1:
+        return Z
+    ng, nk = Z.shape
+    finite = np.isfinite(Z)
+    pad = ((0, -ng % fg), (0, -nk % fk))
+    vals = np.pad(np.where(finite, Z, 0.0), pad)
+    count = np.pad(finite.astype(float), pad)
+    shape = (vals.shape[0] // fg, fg, vals.shape[1] // fk, fk)
+    total = vals.reshape(shape).sum(axis=(1, 3))
+    count = count.reshape(shape).sum(axis=(1, 3))
+    return np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+
+
+def _block_axis(axis, f):
+    # Centre de chaque bloc (bloc de bord partiel compris)
+    axis = np.asarray(axis, dtype=float)
+    if f == 1:
+        return axis
+    n = len(axis)
+    starts = np.arange(0, n, f)
+    return np.add.reduceat(axis, starts) / np.diff(np.append(starts, n))
+
+
+def downsample(gammas, ks, Z, max_side):
+    # Niveau de détail : (gammas, ks, Z) réduits à au plus max_side points par axe
+    fg, fk = lod_factor(len(gammas), max_side), lod_factor(len(ks), max_side)
+    return _block_axis(gammas, fg), _block_axis(ks, fk), block_reduce(Z, fg, fk)
+
+
+def quantize(Z, lo=None, hi=None):
+    # Codes uint8 sur [lo, hi] (étendue des valeurs finies par défaut)
+    Z = np.asarray(Z, dtype=float)
+    finite = np.isfinite(Z)
+    vals = Z[finite]
+    if lo is None:
+        lo = float(vals.min()) if vals.size else 0.0
+    if hi is None:
+        hi = float(vals.max()) if vals.size else 1.0
+    span = hi - lo if hi > lo else 1.0
+    with np.errstate(invalid="ignore"):
+        codes = np.clip(np.rint((Z - lo) / span * (LEVELS - 1)), 0, LEVELS - 1)
+    return np.where(finite, codes, NAN_CODE).astype(np.uint8), lo, hi
+
+
+def _parse_color(color):
+    # "#rrggbb" ou "rgb(r, g, b)" (échelles plotly)
+    if color.startswith("#"):
+        return [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    return [float(v) for v in re.findall(r"[\d.]+", color)[:3]]
+
+
+def palette(colorscale):
+    # Échelle plotly [[position, couleur], …] → table RGB de LEVELS entrées
+    pos = np.array([float(p) for p, _ in colorscale])
+    rgb = np.array([_parse_color(c) for _, c in colorscale], dtype=float)
+    x = np.linspace(0.0, 1.0, LEVELS)
+    return np.rint(np.column_stack([np.interp(x, pos, rgb[:, i]) for i in range(3)])).astype(np.uint8)
+
+
+def _filter_rows(codes):
+    # Filtre PNG par ligne (None, Sub ou Up) : somme minimale des résidus signés
+    none = np.ascontiguousarray(codes, dtype=np.uint8)
+    sub = none.copy()
+    sub[:, 1:] -= none[:, :-1]
+    up = none.copy()
+    up[1:] -= none[:-1]
+    candidates = np.stack([none, sub, up])
+    cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+    best = cost.argmin(axis=0)
+    rows = candidates[best, np.arange(none.shape[0])]
+    return np.column_stack([best.astype(np.uint8), rows]).tobytes()
+
+
+def _chunk(tag, data):
+    crc = zlib.crc32(tag + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+
+def encode_png(codes, lut, level=6):
+    # PNG indexé 8 bits ; la ligne 0 de codes est le haut de l'image
+    h, w = codes.shape
+    plte = np.zeros((256, 3), dtype=np.uint8)
+    plte[:len(lut)] = lut
+    trns = bytes([255] * NAN_CODE + [0])
+    return b"".join([
+        _PNG_SIGNATURE,
+        _chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 3, 0, 0, 0)),
+        _chunk(b"PLTE", plte.tobytes()),
+        _chunk(b"tRNS", trns),
+        _chunk(b"IDAT", zlib.compress(_filter_rows(codes), level)),
+        _chunk(b"IEND", b""),
+    ])
+
+
+def png_data_uri(codes, lut):
+    return "data:image/png;base64," + base64.b64encode(encode_png(codes, lut)).decode("ascii")
+
+
+def raster_grid(gammas, ks, Z, lut, max_side=800, lo=None, hi=None):
+    # Image de la grille (γ en ordonnée croissante) : source PNG, origine,
+    # pas des pixels et étendue des couleurs
+    g, k, Zr = downsample(gammas, ks, Z, max_side)
+    codes, lo, hi = quantize(Zr, lo, hi)
+    # go.Image place la ligne i du PNG en y0 + i·dy : ligne 0 = γ min, à y0
+    source = png_data_uri(codes, lut)
+    dg = g[1] - g[0] if len(g) > 1 else 1.0
+    dk = k[1] - k[0] if len(k) > 1 else 1.0
+    return {"source": source, "x0": float(k[0]), "dx": float(dk), "y0": float(g[0]),
+            "dy": float(dg), "lo": lo, "hi": hi, "shape": Zr.shape}
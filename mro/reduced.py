@@ -0,0 +1,120 @@
+import numpy as np
+
+from .analytic import flat_params
+from .metrics import peak_metrics
+
+
+# ===========================
+#   Réduction adimensionnelle (ζ, ω0)
+# ===========================
+#
+# Avec τ = ω0·t, ω0 = √(k/m) et ζ = γ / 2√(mk), la forme de x(t) ne dépend
+# que de ζ et du rapport des conditions initiales x0 : v0/ω0. Pour les deux
+# familles « pures » (v0 = 0 : lâcher en déplacement, x0 = 0 : impulsion),
+# les métriques se ramènent à une fonction de ζ mise à l'échelle :
+#   t_pic = τ1(ζ) / ω0,  |x(t_pic)| = R·P(ζ),  τ_decay = 1 / (ω0·r(ζ))
+# avec R = |x0| ou |v0|/ω0. Une table 1-D en ζ précalculée une fois sert
+# ensuite n'importe quelle grille (m, γ, k) par np.interp. Les cellules hors
+# table (conditions mixtes, k = 0, ζ > zeta_max, pic hors fenêtre) passent
+# par le moteur exact de mro.metrics.
+
+_FAMILIES = {"disp": (1.0, 0.0), "vel": (0.0, 1.0)}
+
+
+class ZetaTable:
+    def __init__(self, n=8192, zeta_max=50.0):
+        # Espacement géométrique en |1 − ζ| : les métriques ont une
+        # singularité en racine carrée au point critique ζ = 1
+        # (linéaire sur [0, 0.5[ où tout est régulier).
+        n_under = n // 2
+        n_lin = n_under // 2
+        under = np.concatenate([
+            np.linspace(0.0, 0.5, n_lin, endpoint=False),
+            1.0 - np.geomspace(0.5, 1e-12, n_under - n_lin),
+        ])
+        over = 1.0 + np.geomspace(1e-12, zeta_max - 1.0, n - n_under - 1)
+        self.zeta = np.concatenate([under, [1.0], over])
+        self.zeta_max = float(zeta_max)
+
+        # m = k = 1 ⇒ ω0 = 1 : les métriques sont directement adimensionnelles
+        self.tables = {}
+        for name, (x0, v0) in _FAMILIES.items():
+            met = peak_metrics(1.0, 2.0 * self.zeta, 1.0, x0=x0, v0=v0)
+            has_peak = np.isfinite(met["peak_time"])
+            self.tables[name] = {
+                # 1/τ1 reste borné (0 quand il n'y a pas d'extremum)
+                "inv_peak_time": np.where(has_peak, 1.0 / np.where(has_peak, met["peak_time"], 1.0), 0.0),
+                "peak_ratio": np.where(has_peak, met["peak_amp"], 0.0),
+                "decay_rate": np.where(
+                    np.isfinite(met["decay_time"]), 1.0 / met["decay_time"], 0.0
+                ),
+                "overshoot": met["overshoot"],
+            }
+
+    def _interp(self, family, key, zeta):
+        return np.interp(zeta, self.zeta, self.tables[family][key])
+
+    def lookup(self, m, gamma, k, x0=1.0, v0=0.0, t_end=np.inf):
+        shape, (m, gamma, k, x0, v0, t_end) = flat_params(m, gamma, k, x0, v0, t_end)
+
+        w0 = np.sqrt(np.where(k > 0, k / m, 1.0))
+        zeta = gamma / (2.0 * m * w0)
+        covered = (k > 0) & (zeta <= self.zeta_max) & ((x0 == 0) | (v0 == 0))
+        out = {key: np.empty(m.shape) for key in ("max_amp", "peak_time", "peak_amp", "decay_time", "overshoot", "zeta")}
+
+        for family, sel in (("disp", covered & (v0 == 0)), ("vel", covered & (v0 != 0))):
+            if not sel.any():
+                continue
+            z, w = zeta[sel], w0[sel]
+            R = np.abs(x0[sel]) if family == "disp" else np.abs(v0[sel]) / w
+            inv_tp = self._interp(family, "inv_peak_time", z)
+            ratio = self._interp(family, "peak_ratio", z)
+            rate = self._interp(family, "decay_rate", z)
+
+            has_peak = inv_tp > 0
+            peak_time = np.where(has_peak, 1.0 / (w * np.where(has_peak, inv_tp, 1.0)), np.inf)
+            peak_amp = np.where(has_peak, R * ratio, np.nan)
+            if family == "disp":
+                # L'énergie décroît : |x(t)| ≤ |x0| quand v0 = 0
+                max_amp = R
+            else:
+                max_amp = np.where(has_peak, R * ratio, np.nan)
+                # Pic au-delà de t_end : renvoyé au moteur exact
+                late = ~has_peak | (peak_time > t_end[sel])
+                idx = np.flatnonzero(sel)[late]
+                covered[idx] = False
+
+            out["max_amp"][sel] = max_amp
+            out["peak_time"][sel] = peak_time
+            out["peak_amp"][sel] = peak_amp
+            out["decay_time"][sel] = np.where(rate > 0, 1.0 / (w * np.where(rate > 0, rate, 1.0)), np.inf)
+            out["overshoot"][sel] = self._interp(family, "overshoot", z)
+            out["zeta"][sel] = z
+
+        rest = ~covered
+        if rest.any():
+            exact = peak_metrics(m[rest], gamma[rest], k[rest], x0[rest], v0[rest], t_end[rest])
+            for key, val in exact.items():
+                out[key][rest] = val
+
+        return {key: val.reshape(shape) for key, val in out.items()}
+
+
+_TABLE = None
+
+
+def zeta_table():
+    # Table partagée, construite au premier appel (~quelques ms)
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = ZetaTable()
+    return _TABLE
+
+
+def grid_metric_reduced(gammas, ks, metric="max_amp", m=1.0, x0=1.0, v0=0.0, t_end=30.0):
+    G, K = np.meshgrid(
+        np.asarray(gammas, dtype=float),
+        np.asarray(ks, dtype=float),
+        indexing="ij",
+    )
+    return zeta_table().lookup(m, G, K, x0=x0, v0=v0, t_end=t_end)[metric]
@@ -0,0 +1,177 @@
+import hashlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+# ===========================
+#   Cache partagé entre workers (SQLite local)
+# ===========================
+#
+# gunicorn lance plusieurs workers sans mémoire commune : ce cache sur disque
+# (un fichier SQLite en mode WAL sur l'hôte) leur permet de réutiliser les
+# grilles et trajectoires calculées par les autres, et survit au recyclage
+# des workers. Valeurs : tableau NumPy ou tuple de tableaux, sérialisés en
+# .npz sans pickle. Chaque écriture est une transaction (atomique) ; taille
+# totale plafonnée (éviction du moins récemment lu) et durée de vie (TTL).
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def _encode(value):
+    if isinstance(value, np.ndarray):
+        kind, arrays = "array", [value]
+    else:
+        kind, arrays = "tuple", list(value)
+    buf = io.BytesIO()
+    np.savez(buf, *arrays)
+    return kind, buf.getvalue()
+
+
+def _decode(kind, blob):
+    with np.load(io.BytesIO(blob), allow_pickle=False) as npz:
+        arrays = [npz[f"arr_{i}"] for i in range(len(npz.files))]
+    return arrays[0] if kind == "array" else tuple(arrays)
+
+
+def _digest(key):
+    return hashlib.blake2b(repr(key).encode(), digest_size=20).hexdigest()
+
+
+class SharedCache:
+    def __init__(self, path, max_bytes=512 * 2**20, ttl=7 * 24 * 3600.0):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.ttl = float(ttl)
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # Une connexion par thread et par processus (gunicorn fork après import)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key, default=None):
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT kind, value, created FROM entries WHERE key = ?",
+                (_digest(key),),
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                self.misses += 1
+                return default
+            conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, _digest(key))
+            )
+            value = _decode(row[0], row[1])
+        except (sqlite3.Error, OSError, ValueError):
+            # Cache indisponible ou entrée corrompue : simple défaut de cache
+            self.errors += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        now = time.time()
+        try:
+            kind, blob = _encode(value)
+            if len(blob) > self.max_bytes:
+                return value
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (_digest(key), kind, blob, len(blob), now, now),
+                )
+                conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+                total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM entries").fetchone()[0]
+                if total > self.max_bytes:
+                    self._evict(conn, total - self.max_bytes)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except (sqlite3.Error, OSError, ValueError):
+            self.errors += 1
+        return value
+
+    def _evict(self, conn, excess):
+        freed = 0
+        doomed = []
+        for key, nbytes in conn.execute("SELECT key, nbytes FROM entries ORDER BY accessed"):
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += nbytes
+        conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def clear(self):
+        try:
+            self._connect().execute("DELETE FROM entries")
+        except sqlite3.Error:
+            self.errors += 1
+
+    def stats(self):
+        try:
+            entries, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries"
+            ).fetchone()
+        except sqlite3.Error:
+            entries, total = None, None
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def shared_cache_from_env():
+    # MRO_SHARED_CACHE : chemin du fichier SQLite ("off" pour désactiver)
+    path = os.environ.get(
+        "MRO_SHARED_CACHE", os.path.join(tempfile.gettempdir(), "mro_cache.sqlite")
+    )
+    if not path or path.lower() == "off":
+        return None
+    try:
+        return SharedCache(
+            path,
+            max_bytes=int(os.environ.get("MRO_SHARED_CACHE_BYTES", 512 * 2**20)),
+            ttl=float(os.environ.get("MRO_SHARED_CACHE_TTL", 7 * 24 * 3600)),
+        )
+    except (sqlite3.Error, OSError):
+        return None
@@ -0,0 +1,209 @@
+import json
+import os
+
+import numpy as np
+
+from .analytic import analytic_state
+from .budget import cost_scale
+from .propagator import propagate, propagator_matrix
+
+
+# ===========================
+#   Simulation en flux (mémoire constante)
+# ===========================
+#
+# Les échantillons t_i = t_start + i·Δt sont produits par blocs de taille
+# fixe. Chaque bloc repart de l'état exact x(t_i0), v(t_i0) (solution
+# fermée) puis avance avec le propagateur exp(A·Δt) : aucune dérive entre
+# blocs, et la mémoire ne dépend que de la taille de bloc, pas de t_points.
+
+DEFAULT_STREAM_CHUNK = 65536
+
+SERIES = ("t", "x", "v", "a", "E_kin", "E_pot", "E_tot")
+
+# Lignes formatées par seconde et par cœur (VPS de référence ; MRO_COST_SCALE
+# corrige pour une autre machine). Un export CSV / JSON occupe un worker
+# gunicorn synchrone de bout en bout : il doit finir avant --timeout (30 s
+# par défaut), d'où un plafond de points par format.
+#
+#   MRO_STREAM_SECONDS   durée visée d'un export CSV / JSON (20 s par défaut)
+STREAM_ROWS_PER_S = {"csv": 140_000, "json": 60_000}
+
+# Échantillons par seconde d'un spectre de Welch (simulation + FFT groupées) :
+# ~40 ns par point jusqu'à nperseg = 2^16, jusqu'à ~180 ns au-delà (blocs de
+# 2·nperseg points, hors cache). Même plafond en stream_seconds().
+WELCH_POINTS_PER_S = 20_000_000
+WELCH_LARGE_POINTS_PER_S = 5_000_000
+WELCH_LARGE_SEGMENT = 2**16
+
+
+def stream_seconds():
+    return float(os.environ.get("MRO_STREAM_SECONDS", 20.0))
+
+
+def stream_max_points(fmt):
+    # Points servis par un export fmt dans stream_seconds()
+    return max(2, int(stream_seconds() * STREAM_ROWS_PER_S[fmt] / cost_scale()))
+
+
+def spectrum_max_points(nperseg):
+    # Points servis par un spectre de Welch (segments de nperseg) dans stream_seconds()
+    rate = WELCH_POINTS_PER_S if nperseg <= WELCH_LARGE_SEGMENT else WELCH_LARGE_POINTS_PER_S
+    return max(2, int(stream_seconds() * rate / cost_scale()))
+
+
+def iter_simulation(
+    m=1.0,
+    gamma=0.15,
+    k=1.0,
+    x0=1.0,
+    v0=0.0,
+    t_start=0.0,
+    t_end=30.0,
+    t_points=3000,
+    chunk=DEFAULT_STREAM_CHUNK,
+):
+    t_points = int(t_points)
+    chunk = max(1, int(chunk))
+    dt = (t_end - t_start) / max(t_points - 1, 1)
+    phi = propagator_matrix(m, gamma, k, dt)
+    for i0 in range(0, t_points, chunk):
+        n = min(chunk, t_points - i0)
+        tau = i0 * dt
+        xs, vs = analytic_state(tau, m, gamma, k, x0, v0)
+        S = propagate(phi, [float(xs), float(vs)], n)
+        t = t_start + (i0 + np.arange(n)) * dt
+        yield t, S[:, 0], S[:, 1]
+
+
+def derived_series(t, x, v, m, gamma, k):
+    a = -(gamma / m) * v - (k / m) * x
+    ek = 0.5 * m * (v ** 2)
+    ep = 0.5 * k * (x ** 2)
+    return {"t": t, "x": x, "v": v, "a": a, "E_kin": ek, "E_pot": ep, "E_tot": ek + ep}
+
+
+# --- Export CSV / JSON incrémental ---
+#
+# Les formateurs consomment des blocs (t, x, v) : flux long (iter_simulation)
+# ou trajectoire unique déjà en cache ([simulate(...)]).
+
+def write_csv(chunks, m, gamma, k):
+    yield ",".join(SERIES) + "\n"
+    for t, x, v in chunks:
+        cols = derived_series(t, x, v, m, gamma, k)
+        # tolist() → floats Python : même rendu (repr) que l'export historique
+        rows = zip(*(cols[name].tolist() for name in SERIES))
+        yield "".join(",".join(map(str, row)) + "\n" for row in rows)
+
+
+def write_json(make_chunks, params, m, gamma, k):
+    # Même structure que l'export JSON historique ; chaque colonne est produite
+    # par une passe dédiée sur make_chunks() (déterministe, sans stockage).
+    yield '{"params": ' + json.dumps(params) + ', "series": {'
+    for c, name in enumerate(SERIES):
+        yield ("" if c == 0 else ", ") + json.dumps(name) + ": ["
+        first = True
+        for t, x, v in make_chunks():
+            values = derived_series(t, x, v, m, gamma, k)[name].tolist()
+            if values:
+                yield ("" if first else ", ") + ", ".join(map(json.dumps, values))
+                first = False
+        yield "]"
+    yield "}}"
+
+
+def iter_csv(m, gamma, k, x0, v0, t_end, t_points=3000, t_start=0.0, chunk=DEFAULT_STREAM_CHUNK):
+    chunks = iter_simulation(m, gamma, k, x0, v0, t_start, t_end, t_points, chunk)
+    return write_csv(chunks, m, gamma, k)
+
+
+def iter_json(m, gamma, k, x0, v0, t_end, t_points=3000, t_start=0.0, chunk=DEFAULT_STREAM_CHUNK):
+    params = {"m": m, "gamma": gamma, "k": k, "x0": x0, "v0": v0, "t_end": t_end}
+    return write_json(
+        lambda: iter_simulation(m, gamma, k, x0, v0, t_start, t_end, t_points, chunk),
+        params, m, gamma, k,
+    )
+
+
+# --- Décimation min/max à la volée (tracé) ---
+
+def minmax_decimate(
+    m,
+    gamma,
+    k,
+    x0,
+    v0,
+    t_end,
+    t_points,
+    n_buckets=2000,
+    t_start=0.0,
+    series="x",
+    chunk=DEFAULT_STREAM_CHUNK,
+):
+    # Deux points par seau (min et max, dans l'ordre temporel) : l'enveloppe
+    # visuelle est conservée avec 2·n_buckets points quelle que soit t_points.
+    t_points = int(t_points)
+    bucket = max(1, -(-t_points // max(int(n_buckets), 1)))
+    chunk = max(bucket, (int(chunk) // bucket) * bucket)
+    t_out, y_out = [], []
+    for t, x, v in iter_simulation(m, gamma, k, x0, v0, t_start, t_end, t_points, chunk):
+        y = derived_series(t, x, v, m, gamma, k)[series]
+        n_full = -(-y.shape[0] // bucket)
+        pad = n_full * bucket - y.shape[0]
+        yb = np.pad(y, (0, pad), mode="edge").reshape(n_full, bucket)
+        tb = np.pad(t, (0, pad), mode="edge").reshape(n_full, bucket)
+        i_min = np.argmin(yb, axis=1)
+        i_max = np.argmax(yb, axis=1)
+        lo = np.minimum(i_min, i_max)
+        hi = np.maximum(i_min, i_max)
+        rows = np.arange(n_full)
+        pair_t = np.stack([tb[rows, lo], tb[rows, hi]], axis=1).ravel()
+        pair_y = np.stack([yb[rows, lo], yb[rows, hi]], axis=1).ravel()
+        t_out.append(pair_t)
+        y_out.append(pair_y)
+    if not t_out:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(t_out), np.concatenate(y_out)
+
+
+# --- Spectre accumulé (Welch) ---
+
+def welch_spectrum(
+    m,
+    gamma,
+    k,
+    x0,
+    v0,
+    t_end,
+    t_points,
+    nperseg=4096,
+    t_start=0.0,
+):
+    # Moyenne des |FFT|² de segments fenêtrés (Hann, recouvrement 50 %)
+    # accumulée bloc par bloc : les segments d'un bloc partent en une FFT
+    # groupée (vues glissantes, ~2·DEFAULT_STREAM_CHUNK valeurs par lot),
+    # mémoire O(max(nperseg, bloc)).
+    nperseg = int(min(nperseg, t_points))
+    hop = max(1, nperseg // 2)
+    window = np.hanning(nperseg)
+    dt = (t_end - t_start) / max(int(t_points) - 1, 1)
+    group = max(1, 2 * DEFAULT_STREAM_CHUNK // nperseg)
+    acc = np.zeros(nperseg // 2 + 1)
+    count = 0
+    tail = np.empty(0)
+    chunk = max(DEFAULT_STREAM_CHUNK, 2 * nperseg)
+    for _, x, _ in iter_simulation(m, gamma, k, x0, v0, t_start, t_end, t_points, chunk=chunk):
+        buf = np.concatenate([tail, x])
+        if buf.shape[0] < nperseg:
+            tail = buf
+            continue
+        segments = np.lib.stride_tricks.sliding_window_view(buf, nperseg)[::hop]
+        for lo in range(0, segments.shape[0], group):
+            seg = segments[lo:lo + group]
+            seg = (seg - seg.mean(axis=1, keepdims=True)) * window
+            acc += (np.abs(np.fft.rfft(seg, axis=1)) ** 2).sum(axis=0)
+        count += segments.shape[0]
+        tail = buf[segments.shape[0] * hop:]
+    freqs = np.fft.rfftfreq(nperseg, d=dt)
+    return freqs, acc / max(count, 1)
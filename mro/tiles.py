@@ -0,0 +1,174 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .memo import quantize_array
+
+
+# ===========================
+#   Cache incrémental de cellules (γ, k)
+# ===========================
+#
+# Pour un contexte donné (métrique, m, x0, v0, t_end, mode, ...), on garde une
+# grille creuse : axes γ et k triés (union de tout ce qui a été demandé),
+# valeurs Z et masque « connu ». Une nouvelle grille ne calcule que ses
+# cellules absentes, en un seul lot vectorisé ; le reste est lu. Élargir une
+# plage ou ajouter une ligne ne coûte donc que les nouvelles cellules.
+#
+# Les tâches de fond Dash tournent dans des processus jetables : flush()
+# dépose les contextes modifiés dans le cache partagé (SQLite), avec un
+# tampon aléatoire. Tout processus dont la copie n'a pas ce tampon fusionne
+# la version partagée avant de calculer.
+
+
+def _axis_key(values):
+    # Valeurs arrondies à ~12 chiffres (même règle que les clés du cache LRU)
+    return quantize_array(values).view(np.float64)
+
+
+def _empty_entry():
+    return (np.empty(0), np.empty(0), np.empty((0, 0)), np.zeros((0, 0), bool))
+
+
+def _expand(entry, new_g, new_k, tail=None):
+    # Grille creuse replacée sur les axes (new_g, new_k) ⊇ ses propres axes
+    g_axis, k_axis, Z, known = entry
+    tail = Z.shape[2:] if tail is None else tail
+    if new_g.size == g_axis.size and new_k.size == k_axis.size and Z.shape[2:] == tail:
+        return Z, known
+    Z2 = np.empty((new_g.size, new_k.size) + tail)
+    known2 = np.zeros((new_g.size, new_k.size), bool)
+    if known.any():
+        old = np.ix_(np.searchsorted(new_g, g_axis), np.searchsorted(new_k, k_axis))
+        Z2[old] = Z
+        known2[old] = known
+    return Z2, known2
+
+
+def _merge(a, b):
+    # Union de deux grilles creuses d'un même contexte (b prioritaire)
+    new_g = np.union1d(a[0], b[0])
+    new_k = np.union1d(a[1], b[1])
+    tail = b[2].shape[2:] if b[3].any() else a[2].shape[2:]
+    Za, ka = _expand(a, new_g, new_k, tail)
+    Zb, kb = _expand(b, new_g, new_k, tail)
+    mask = kb.reshape(kb.shape + (1,) * len(tail))
+    return new_g, new_k, np.where(mask, Zb, Za), ka | kb
+
+
+class TileStore:
+    def __init__(self, max_cells=4_000_000, max_contexts=8, shared=None):
+        self.max_cells = int(max_cells)
+        self.max_contexts = int(max_contexts)
+        # shared : SharedCache (mro.sharedcache) ou None
+        self.shared = shared
+        self._grids = OrderedDict()
+        self._stamps = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.reused = 0
+        self.loaded = 0
+        self.flushed = 0
+
+    def _shared_stamp(self, context):
+        stamp = self.shared.get(("tiles-stamp", context))
+        return None if stamp is None else int(stamp[0])
+
+    def _pull(self, context, entry):
+        # Version partagée fusionnée si elle diffère de celle déjà vue
+        if self.shared is None:
+            return entry
+        stamp = self._shared_stamp(context)
+        if stamp is None or stamp == self._stamps.get(context):
+            return entry
+        stored = self.shared.get(("tiles", context))
+        if stored is None:
+            return entry
+        self._stamps[context] = stamp
+        self.loaded += 1
+        return _merge(entry, tuple(stored))
+
+    def assemble(self, context, gammas, ks, compute_cells):
+        # compute_cells(G, K) : valeurs pour des tableaux plats de cellules,
+        # forme (n,) ou (n, C) pour une grille multi-canal (voir mro.channels)
+        gammas = np.asarray(gammas, dtype=float)
+        ks = np.asarray(ks, dtype=float)
+        qg, qk = _axis_key(gammas), _axis_key(ks)
+
+        with self._lock:
+            entry = self._grids.pop(context, None) or _empty_entry()
+            entry = self._pull(context, entry)
+            g_axis, k_axis = entry[0], entry[1]
+
+            new_g = np.union1d(g_axis, qg)
+            new_k = np.union1d(k_axis, qk)
+            if new_g.size * new_k.size > self.max_cells:
+                # Union trop vaste : on repart de la seule grille demandée
+                entry = _empty_entry()
+                new_g, new_k = np.unique(qg), np.unique(qk)
+            Z, known = _expand(entry, new_g, new_k)
+
+            ig = np.searchsorted(new_g, qg)
+            ik = np.searchsorted(new_k, qk)
+            sub = Z[np.ix_(ig, ik)]
+            missing = ~known[np.ix_(ig, ik)]
+            if missing.any():
+                gi, ki = np.nonzero(missing)
+                vals = np.asarray(compute_cells(gammas[gi], ks[ki]), dtype=float)
+                if vals.shape[1:] != Z.shape[2:]:
+                    # Premier lot du contexte : on connaît enfin le nombre de canaux
+                    Z = np.empty(Z.shape[:2] + vals.shape[1:])
+                    sub = Z[np.ix_(ig, ik)]
+                sub[gi, ki] = vals
+                Z[ig[gi], ik[ki]] = vals
+                known[ig[gi], ik[ki]] = True
+                self._dirty.add(context)
+            n_missing = int(missing.sum())
+            self.computed += n_missing
+            self.reused += sub.size - n_missing
+
+            self._grids[context] = (new_g, new_k, Z, known)
+            while len(self._grids) > self.max_contexts:
+                old, _ = self._grids.popitem(last=False)
+                self._dirty.discard(old)
+        return sub
+
+    def flush(self):
+        # Contextes modifiés → cache partagé (fin de tâche de fond) ; renvoie
+        # le nombre de contextes écrits
+        if self.shared is None:
+            return 0
+        written = 0
+        with self._lock:
+            for context in list(self._dirty):
+                entry = self._pull(context, self._grids[context])
+                stamp = int(np.frombuffer(os.urandom(8), dtype=np.int64)[0])
+                self.shared.put(("tiles", context), entry)
+                self.shared.put(("tiles-stamp", context), np.array([stamp]))
+                self._grids[context] = entry
+                self._stamps[context] = stamp
+                written += 1
+            self._dirty.clear()
+            self.flushed += written
+        return written
+
+    def clear(self):
+        with self._lock:
+            self._grids.clear()
+            self._stamps.clear()
+            self._dirty.clear()
+
+    def stats(self):
+        with self._lock:
+            cells = sum(int(e[3].sum()) for e in self._grids.values())
+            return {
+                "contexts": len(self._grids),
+                "cells": cells,
+                "computed": self.computed,
+                "reused": self.reused,
+                "loaded": self.loaded,
+                "flushed": self.flushed,
+            }
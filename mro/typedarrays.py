@@ -0,0 +1,183 @@
+import base64
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+
+# ===========================
+#   Tableaux typés plotly (bdata / dtype) pour les réponses Dash
+# ===========================
+#
+# Une liste JSON de float64 coûte ~18 octets par valeur, texte à produire
+# puis à reparser côté navigateur. Plotly.js accepte aussi les tableaux
+# typés encodés en base64 ({"dtype": "f4", "bdata": …}) : 5,3 octets par
+# float32, 10,7 par float64, aucun formatage décimal. Seules les traces
+# (data) sont encodées : les attributs de layout n'acceptent pas cette forme.
+#
+#   MRO_FLOAT32         "1" (défaut) : flottants d'affichage réduits en float32
+#   MRO_PAYLOAD_STATS   "1" : mesure des octets économisés par callback
+#                       (/_stats/payload ; journal "mro.payload" pour les
+#                       tâches de fond, qui tournent dans un autre processus)
+
+# En deçà, le gain ne compense pas l'en-tête base64
+MIN_TYPED = 16
+
+# Types entiers lus par plotly.js (pas de 64 bits)
+_INT_TYPES = (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32)
+
+_LOG = logging.getLogger("mro.payload")
+_STATS = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _flag(name, default):
+    return os.environ.get(name, default).lower() not in ("0", "off", "false", "no")
+
+
+def float32_enabled():
+    return _flag("MRO_FLOAT32", "1")
+
+
+def payload_stats_enabled():
+    return _flag("MRO_PAYLOAD_STATS", "0")
+
+
+def _is_typed(v):
+    return isinstance(v, dict) and "bdata" in v and "dtype" in v
+
+
+def _decode(v):
+    a = np.frombuffer(base64.b64decode(v["bdata"]), dtype=np.dtype(v["dtype"]).newbyteorder("<"))
+    if "shape" in v:
+        a = a.reshape([int(s) for s in str(v["shape"]).split(",")])
+    return a
+
+
+def _narrow_int(a):
+    lo, hi = (int(a.min()), int(a.max())) if a.size else (0, 0)
+    for t in _INT_TYPES:
+        info = np.iinfo(t)
+        if info.min <= lo and hi <= info.max:
+            return a.astype(t)
+    return a.astype(np.float64)
+
+
+def typed_array(a, float32=None):
+    # Tableau numérique → forme typée plotly ; autre chose renvoyé tel quel
+    if _is_typed(a):
+        a = _decode(a)
+    try:
+        arr = np.asarray(a)
+    except ValueError:  # listes imbriquées irrégulières
+        return a
+    if arr.dtype.kind == "b":
+        arr = arr.astype(np.uint8)
+    elif arr.dtype.kind in "iu":
+        arr = _narrow_int(arr)
+    elif arr.dtype.kind == "f":
+        float32 = float32_enabled() if float32 is None else float32
+        arr = arr.astype(np.float32 if float32 else np.float64)
+    else:
+        return a
+    arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+    out = {"dtype": arr.dtype.str[1:], "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+    if arr.ndim > 1:
+        out["shape"] = ", ".join(str(s) for s in arr.shape)
+    return out
+
+
+def _encode(obj, float32):
+    if hasattr(obj, "to_plotly_json"):  # trace plotly (go.Scatter…)
+        obj = obj.to_plotly_json()
+    if isinstance(obj, dict):
+        if _is_typed(obj):
+            return typed_array(obj, float32)
+        return {key: _encode(v, float32) for key, v in obj.items()}
+    if isinstance(obj, (list, tuple)) and obj:
+        # Liste de traces (patch["data"] = [go.Surface(...)]) : chacune encodée
+        items = [v.to_plotly_json() if hasattr(v, "to_plotly_json") else v for v in obj]
+        if all(isinstance(v, dict) for v in items):
+            return [_encode(v, float32) for v in items]
+    if isinstance(obj, (np.ndarray, list, tuple)):
+        try:
+            size = np.size(obj)
+        except ValueError:  # listes imbriquées irrégulières
+            return obj
+        return typed_array(obj, float32) if size >= MIN_TYPED else obj
+    return obj
+
+
+def encode_figure(fig, float32=None):
+    # go.Figure ou dict → dict dont les traces portent des tableaux typés
+    fig = fig.to_plotly_json() if hasattr(fig, "to_plotly_json") else dict(fig)
+    fig["data"] = [_encode(trace, float32) for trace in fig.get("data", [])]
+    return fig
+
+
+def encode_patch(patch, name=None, float32=None):
+    # dash.Patch (ou sa forme JSON) : valeurs des opérations sur "data" encodées
+    patch = patch.to_plotly_json() if hasattr(patch, "to_plotly_json") else patch
+    operations = [
+        dict(op, params=dict(op["params"], value=_encode(op["params"]["value"], float32)))
+        if op["location"][:1] == ["data"] and "value" in op["params"] else op
+        for op in patch["operations"]
+    ]
+    if name is not None:
+        record_payload(name, patch["operations"], operations)
+    return dict(patch, operations=operations)
+
+
+# --- Mesure ---
+
+def _as_lists(obj):
+    # Forme texte d'origine (listes décimales), pour la mesure uniquement
+    if _is_typed(obj):
+        return _decode(obj).astype(float).tolist()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, dict):
+        return {key: _as_lists(v) for key, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_as_lists(v) for v in obj]
+    return obj
+
+
+def _size(obj):
+    from plotly.utils import PlotlyJSONEncoder
+
+    return len(json.dumps(obj, cls=PlotlyJSONEncoder))
+
+
+def record_payload(name, raw, encoded):
+    # raw / encoded : listes de figures (dict) ou de patchs, avant / après
+    if not payload_stats_enabled():
+        return
+    text = sum(_size(_as_lists(r)) for r in raw)
+    typed = sum(_size(e) for e in encoded)
+    with _STATS_LOCK:
+        s = _STATS.setdefault(name, {"calls": 0, "text_bytes": 0, "typed_bytes": 0})
+        s["calls"] += 1
+        s["text_bytes"] += text
+        s["typed_bytes"] += typed
+    _LOG.info("%s : %d → %d octets (%.1f×)", name, text, typed, text / max(typed, 1))
+
+
+def encode_figures(name, *figs, float32=None):
+    # Figures d'un callback encodées ensemble ; octets mesurés si activé
+    raw = [f.to_plotly_json() if hasattr(f, "to_plotly_json") else f for f in figs]
+    encoded = [encode_figure(f, float32) for f in raw]
+    record_payload(name, [{"data": f.get("data", [])} for f in raw],
+                   [{"data": f["data"]} for f in encoded])
+    return encoded
+
+
+def payload_stats():
+    with _STATS_LOCK:
+        stats = {name: dict(s) for name, s in _STATS.items()}
+    for s in stats.values():
+        s["saved_bytes"] = s["text_bytes"] - s["typed_bytes"]
+        s["ratio"] = s["text_bytes"] / max(s["typed_bytes"], 1)
+    return stats
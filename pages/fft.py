@@ -1,9 +1,9 @@
 import numpy as np
-from scipy.integrate import solve_ivp
 
 import dash
 from dash import dcc, html, Input, Output, State, callback
-import plotly.graph_objects as go
+
+from mro import encode_figures, figure, line, simulate, vline
 
 dash.register_page(
     __name__,
@@ -11,25 +11,6 @@ dash.register_page(
     name="FFT avancée",
 )
 
-# --- Modèle local (indépendant) ---
-def MRO_equations(t, Y, m, gamma, k):
-    x, dxdt = Y
-    d2x = -(gamma / m) * dxdt - (k / m) * x
-    return [dxdt, d2x]
-
-def simulate_mro(m, gamma, k, x0, v0, t_end, t_points=4000):
-    t_eval = np.linspace(0, t_end, t_points)
-    sol = solve_ivp(
-        MRO_equations,
-        [0, t_end],
-        [x0, v0],
-        args=(m, gamma, k),
-        t_eval=t_eval,
-        method="RK45",
-    )
-    return sol.t, sol.y[0]
-
-
 layout = html.Div(
     style={"maxWidth": "1100px", "margin": "0 auto", "padding": "24px"},
     children=[
@@ -157,17 +138,16 @@ def _lbl_npow(v): return f"N = 2^{int(v)} points"
     Input("fft-npow", "value"),
 )
 def _fft_analysis(m, gamma, k, x0, v0, t_end, npow):
-    # Simule x(t)
-    t, x = simulate_mro(m, gamma, k, x0, v0, t_end)
-
     # Taille FFT
     n = int(2 ** int(npow))
     if n < 16:
         n = 16
 
-    # Échantillonnage uniforme
-    t_uniform = np.linspace(t[0], t[-1], n)
-    x_uniform = np.interp(t_uniform, t, x)
+    # Simule x(t) directement sur la grille uniforme de la FFT :
+    # propagateur exact exp(A·Δt), plus de rééchantillonnage par interpolation
+    t_uniform, x_uniform, _ = simulate(
+        m=m, gamma=gamma, k=k, x0=x0, v0=v0, t_end=t_end, t_points=n, backend="propagator"
+    )
     dt = (t_uniform[-1] - t_uniform[0]) / (n - 1 + 1e-12)
 
     # FFT
@@ -206,21 +186,13 @@ def _fft_analysis(m, gamma, k, x0, v0, t_end, npow):
     else:
         contrast = 0.0
 
-    # Figure
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=freqs, y=mag, mode="lines", name="|FFT(x)|"))
-    fig.update_layout(
-        xaxis_title="Fréquence (u.a.)",
-        yaxis_title="Amplitude spectrale",
-        title="Spectre de x(t)",
-    )
+    # Figure (dict, mro.figures)
+    fig = figure([line(freqs, mag, "|FFT(x)|")], "Spectre de x(t)", "Fréquence (u.a.)",
+                 "Amplitude spectrale")
     if a_peak > 0:
-        fig.add_vline(
-            x=f_peak,
-            line_dash="dash",
-            annotation_text=f"f* ≈ {f_peak:.4f}",
-            annotation_position="top",
-        )
+        shape, annotation = vline(f_peak, f"f* ≈ {f_peak:.4f}")
+        fig["layout"]["shapes"] = [shape]
+        fig["layout"]["annotations"] = [annotation]
 
     # Texte métriques
     regime = []
@@ -250,4 +222,5 @@ def _fft_analysis(m, gamma, k, x0, v0, t_end, npow):
         html.Ul([html.Li(m) for m in regime]),
     ])
 
-    return fig, metrics
\ No newline at end of file
+    # Tableaux typés (base64) plutôt que listes décimales
+    return encode_figures("_fft_analysis", fig)[0], metrics
\ No newline at end of file
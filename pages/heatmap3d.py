@@ -1,8 +1,34 @@
+import time
+
 import dash
 from dash import dcc, html, Input, Output, State, callback
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
+from plotly.colors import get_colorscale
 import numpy as np
-from scipy.integrate import solve_ivp
+from scipy.spatial import Delaunay
+
+from mro import (
+    CHANNEL_LABELS,
+    CHANNELS,
+    TILE_STORE,
+    BudgetExceeded,
+    adaptive_depth,
+    adaptive_sweep,
+    default_backend,
+    downsample,
+    encode_figures,
+    encode_patch,
+    load_grid,
+    palette,
+    plan_grid,
+    raster_grid,
+    store_grid,
+    strided_axis,
+    sweep_channels,
+    sweep_deadline,
+    zeta_table,
+)
 
 dash.register_page(
     __name__,
@@ -11,42 +37,222 @@ dash.register_page(
     order=40,
 )
 
-# --------- Modèle MRO minimal ---------
-def MRO_equations(t, Y, m, gamma, k):
-    x, dxdt = Y
-    dxdtt = -(gamma/m)*dxdt - (k/m)*x
-    return [dxdt, dxdtt]
-
-def simulate_mro(m=1.0, gamma=0.15, k=1.0, x0=1.0, v0=0.0,
-                 t_start=0.0, t_end=30.0, t_points=1500):
-    t_eval = np.linspace(t_start, t_end, t_points)
-    sol = solve_ivp(
-        MRO_equations,
-        [t_start, t_end],
-        [x0, v0],
-        args=(m, gamma, k),
-        t_eval=t_eval,
-        method='RK45'
+# --------- Balayage (noyau partagé mro.core) ---------
+def heatmap_channels(gammas, ks, m=1.0, x0=1.0, v0=0.0, t_end=30.0, t_points=800,
+                     mode="table"):
+    # Tous les canaux (mro.channels) en une passe : grille (C, γ, k).
+    # "table" / "exact" : formes closes ; "sampled" : t_points échantillons
+    return sweep_channels(gammas, ks, CHANNELS, m=m, x0=x0, v0=v0, t_end=t_end,
+                          t_points=t_points, mode=mode)
+
+# Table ζ construite au démarrage du worker, partagée par toutes les requêtes
+zeta_table()
+
+# Nombre de mises à jour de progression par passe (blocs de lignes γ)
+PROGRESS_STEPS = 20
+# Aperçu immédiat : grille sous-échantillonnée d'au plus PREVIEW_CELLS cellules
+PREVIEW_CELLS = 400
+
+# Rendu : surface 3D réduite à SURFACE_MAX_SIDE points par axe ; au-delà de
+# RASTER_CELLS cellules (mode automatique), image 2D en PNG indexé
+# (mro.raster) d'au plus IMAGE_MAX_SIDE pixels par côté
+SURFACE_MAX_SIDE = 150
+IMAGE_MAX_SIDE = 800
+RASTER_CELLS = 250_000
+VIRIDIS = palette(get_colorscale("Viridis"))
+
+
+def _pass_strides(n_g, n_k):
+    # Pas 2^p, 2^(p-1), …, 1 : la résolution double à chaque passe
+    s = 1
+    while -(-n_g // s) * -(-n_k // s) > PREVIEW_CELLS:
+        s *= 2
+    strides = []
+    while s >= 1:
+        strides.append(s)
+        s //= 2
+    return strides
+
+
+def _display(Z):
+    # inf (Q infini, jamais stabilisé…) non représentable : trou dans la surface
+    return np.where(np.isfinite(Z), Z, np.nan)
+
+
+def _render_mode(render, cells):
+    if render in ("surface", "image"):
+        return render
+    return "image" if cells > RASTER_CELLS else "surface"
+
+
+def _surface_trace(gammas, ks, Z):
+    # Surface 3D : axes = (k, gamma, Z), au plus SURFACE_MAX_SIDE points par axe
+    gammas, ks, Z = downsample(gammas, ks, _display(Z), SURFACE_MAX_SIDE)
+    K, G = np.meshgrid(ks, gammas)
+    return go.Surface(x=K, y=G, z=Z, coloraxis="coloraxis", showscale=True)
+
+
+def _image_traces(gammas, ks, Z, channel, lo=None, hi=None):
+    # Image 2D (quelques dizaines de ko même pour 10⁶ cellules) ; la barre de
+    # couleurs est portée par une trace vide, go.Image n'en ayant pas
+    r = raster_grid(gammas, ks, _display(Z), VIRIDIS, IMAGE_MAX_SIDE, lo, hi)
+    image = go.Image(source=r["source"], x0=r["x0"], dx=r["dx"], y0=r["y0"], dy=r["dy"],
+                     hovertemplate="k = %{x:.4g}<br>γ = %{y:.4g}<extra></extra>")
+    scale = go.Scatter(x=[None], y=[None], mode="markers", hoverinfo="skip", showlegend=False,
+                       marker=dict(color=[r["lo"]], cmin=r["lo"], cmax=r["hi"],
+                                   colorscale="Viridis", showscale=True,
+                                   colorbar=dict(title=CHANNEL_LABELS[channel])))
+    return [image, scale]
+
+
+def _grid_traces(gammas, ks, Z, channel, render):
+    if render == "image":
+        return _image_traces(gammas, ks, Z, channel)
+    return [_surface_trace(gammas, ks, Z)]
+
+
+def _grid_patch(gammas, ks, Z, channel, render):
+    # Mise à jour partielle : seules les traces changent
+    patch = dash.Patch()
+    patch["data"] = _grid_traces(gammas, ks, Z, channel, render)
+    # Forme JSON (tableaux typés) : les valeurs de progression transitent par le cache disque
+    return encode_patch(patch, "_compute_surface")
+
+
+def _empty_patch():
+    return dash.Patch().to_plotly_json()
+
+
+def _tag_frames(set_progress, n):
+    # Trames de progression taguées par le n° de calcul (hm-sweep) : l'aperçu
+    # de ce calcul qui arriverait après elles est ignoré
+    return lambda frame: set_progress(tuple(frame) + ({"sweep": n},))
+
+
+def _sweep_with_progress(gammas, ks, set_progress, label, deadline=None, **kwargs):
+    # Lignes non atteintes avant l'échéance laissées à NaN (grille partielle)
+    total = len(gammas) * len(ks)
+    rows = max(1, -(-len(gammas) // PROGRESS_STEPS))
+    Z = np.full((len(CHANNELS), len(gammas), len(ks)), np.nan)
+    for lo in range(0, len(gammas), rows):
+        if deadline is not None and time.monotonic() > deadline:
+            return Z, lo * len(ks)
+        Z[:, lo:lo + rows] = heatmap_channels(gammas[lo:lo + rows], ks, **kwargs)
+        done = min(lo + rows, len(gammas)) * len(ks)
+        set_progress((_empty_patch(), str(done), str(total), f"{label} – {done}/{total} cellules"))
+    return Z, total
+
+
+def _adaptive_view(gammas, ks, m, t_end, mode):
+    # Paramètres du quadtree (raffiné près de γ² = 4mk) ; pas le plus fin ≤ pas demandé
+    depth, bg, bk = adaptive_depth(len(gammas) - 1, len(ks) - 1)
+    return {"adaptive": True, "gmin": float(gammas[0]), "gmax": float(gammas[-1]),
+            "kmin": float(ks[0]), "kmax": float(ks[-1]), "base": [bg, bk], "depth": depth,
+            "m": m, "t_end": t_end, "mode": mode}
+
+
+def _adaptive_surface(view, channel, on_level=None):
+    # Raffinement guidé par le canal affiché ; tous les canaux sont évalués
+    # aux mêmes points (changement de canal sans recalcul)
+    return adaptive_sweep(view["gmin"], view["gmax"], view["kmin"], view["kmax"], channel,
+                          m=view["m"], x0=1.0, v0=0.0, t_end=view["t_end"], t_points=800,
+                          mode=view["mode"], base=tuple(view["base"]), depth=view["depth"],
+                          on_level=on_level, channels=CHANNELS)
+
+
+def _mesh_trace(G, K, Z):
+    # Triangulation de Delaunay des points évalués (coordonnées normalisées)
+    span_g = max(np.ptp(G), 1e-12)
+    span_k = max(np.ptp(K), 1e-12)
+    tri = Delaunay(np.column_stack([K / span_k, G / span_g])).simplices
+    Z = _display(Z)
+    return go.Mesh3d(x=K, y=G, z=Z, i=tri[:, 0], j=tri[:, 1], k=tri[:, 2],
+                     intensity=Z, coloraxis="coloraxis", flatshading=False)
+
+
+def _surface_title(channel, render="surface"):
+    view = "image 2D" if render == "image" else "surface 3D"
+    return f"{CHANNEL_LABELS[channel]} en fonction de (γ, k) – {view}"
+
+
+def _surface_figure(traces, channel="max_amp", render="surface", revision=None):
+    # revision (n_clicks) : le zoom survit aux mises à jour d'un même calcul
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        title=_surface_title(channel, render),
+        coloraxis=dict(colorscale="Viridis"),
+        margin=dict(l=0, r=0, t=50, b=0),
+        uirevision=revision,
     )
-    t = sol.t
-    x = sol.y[0]
-    v = sol.y[1]
-    return t, x, v
-
-def heatmap_max_amp(gammas, ks, m=1.0, x0=1.0, v0=0.0, t_end=30.0, t_points=800):
-    Z = np.zeros((len(gammas), len(ks)))
-    for i, g in enumerate(gammas):
-        for j, kk in enumerate(ks):
-            t, x, _ = simulate_mro(m=m, gamma=g, k=kk, x0=x0, v0=v0,
-                                   t_start=0.0, t_end=t_end, t_points=t_points)
-            Z[i, j] = np.max(np.abs(x))
-    return Z
+    if render == "image":
+        # γ croissant vers le haut (go.Image inverse l'axe par défaut)
+        fig.update_layout(xaxis_title="k", yaxis=dict(title="γ", autorange=True))
+    else:
+        fig.update_layout(scene=dict(
+            xaxis_title="k",
+            yaxis_title="γ",
+            zaxis_title=CHANNEL_LABELS[channel],
+        ))
+    return fig
+
+
+def _window(relayout, gammas, ks):
+    # Tranches (γ, k) de la fenêtre zoomée, une cellule de marge ; grille entière
+    # après un double-clic (autorange)
+    def bounds(axis, name):
+        rng = relayout.get(f"{name}.range") or [relayout.get(f"{name}.range[0]"),
+                                                 relayout.get(f"{name}.range[1]")]
+        if None in rng:
+            return slice(None)
+        lo, hi = sorted(float(v) for v in rng)
+        i = max(int(np.searchsorted(axis, lo)) - 1, 0)
+        j = min(int(np.searchsorted(axis, hi)) + 1, len(axis))
+        return slice(i, max(j, i + 2))
+
+    return bounds(gammas, "yaxis"), bounds(ks, "xaxis")
+
+
+def _image_patch(stored, channel, relayout=None):
+    # Fenêtre re-rendue depuis la grille stockée (jusqu'à la pleine
+    # résolution) ; couleurs fixées sur l'étendue de la grille entière
+    gammas, ks, Z = stored
+    Z = _display(Z[CHANNELS.index(channel)])
+    finite = Z[np.isfinite(Z)]
+    lo, hi = (float(finite.min()), float(finite.max())) if finite.size else (None, None)
+    sg, sk = _window(relayout or {}, gammas, ks)
+    patch = dash.Patch()
+    patch["data"] = _image_traces(gammas[sg], ks[sk], Z[sg, sk], channel, lo, hi)
+    return patch
+
+
+# Points par axe au plus : un pas minuscule ne doit pas allouer des Go avant
+# même l'estimation du coût
+MAX_AXIS_POINTS = 20_000
+
+
+def _axis(lo, hi, step):
+    lo, hi, step = float(lo), float(hi), abs(float(step or 0))
+    step = max(step, (hi - lo) / MAX_AXIS_POINTS, 1e-12)
+    return np.arange(lo, hi + 1e-12, step)
+
+
+def _grid_axes(gmin, gmax, gstep, kmin, kmax, kstep):
+    return _axis(gmin, gmax, gstep), _axis(kmin, kmax, kstep)
+
+
+def _range_error(gmin, gmax, kmin, kmax):
+    # Plage vide (min > max) ou incomplète : message, sinon None
+    if None in (gmin, gmax, kmin, kmax):
+        return "Plage incomplète : renseigner γ min / max et k min / max."
+    if float(gmin) > float(gmax) or float(kmin) > float(kmax):
+        return "Plage vide : γ min et k min doivent être ≤ γ max et k max."
+    return None
 
 # --------- Layout ---------
 layout = html.Div(
     style={"maxWidth": "1200px", "margin": "0 auto", "padding": "24px"},
     children=[
-        html.H1("Heatmap 3D – Max |x(t)| sur (γ, k)"),
+        html.H1("Heatmap 3D – métriques sur (γ, k)"),
         html.P("Surface 3D du maximum d’amplitude |x(t)| en balayant (γ, k). Choisis m et la grille (résolution modérée = plus rapide)."),
 
         html.Div(style={"display": "grid", "gridTemplateColumns": "1fr 1fr", "gap": "16px"}, children=[
@@ -99,18 +305,69 @@ layout = html.Div(
             ]),
         ]),
 
+        html.Div(style={"marginTop": "10px"}, children=[
+            html.Label("Mode de calcul"),
+            dcc.RadioItems(
+                id="hm-mode",
+                options=[
+                    {"label": "Table ζ (réduction adimensionnelle)", "value": "table"},
+                    {"label": "Pic analytique exact", "value": "exact"},
+                    {"label": "Échantillonné (800 points)", "value": "sampled"},
+                ],
+                value="table",
+                inline=True,
+                inputStyle={"marginRight": "4px", "marginLeft": "10px"},
+            ),
+            html.Label("Rendu", style={"marginTop": "8px"}),
+            dcc.RadioItems(
+                id="hm-render",
+                options=[
+                    {"label": "Automatique", "value": "auto"},
+                    {"label": "Surface 3D", "value": "surface"},
+                    {"label": "Image 2D (grandes grilles)", "value": "image"},
+                ],
+                value="auto",
+                inline=True,
+                inputStyle={"marginRight": "4px", "marginLeft": "10px"},
+            ),
+            html.Label("Canal affiché", style={"marginTop": "8px"}),
+            dcc.Dropdown(
+                id="hm-channel",
+                options=[{"label": CHANNEL_LABELS[c], "value": c} for c in CHANNELS],
+                value="max_amp",
+                clearable=False,
+                style={"maxWidth": "360px"},
+            ),
+            dcc.Checklist(
+                id="hm-adaptive",
+                options=[{"label": "Raffinement adaptatif (quadtree près de γ² = 4mk)", "value": "on"}],
+                value=[],
+                inputStyle={"marginRight": "4px"},
+            ),
+        ]),
+
         html.Div(style={"marginTop": "10px"}, children=[
             html.Button("Calculer la surface 3D", id="btn-heatmap3d", n_clicks=0),
+            html.Button("Annuler", id="hm-cancel", n_clicks=0, disabled=True,
+                        style={"marginLeft": "8px"}),
             html.Span(id="hm-warn", style={"marginLeft": "12px", "color": "#888"}),
         ]),
 
+        html.Div(style={"marginTop": "8px"}, children=[
+            html.Progress(id="hm-progress", value="0", max="1", style={"width": "240px"}),
+            html.Span(id="hm-progress-text", style={"marginLeft": "8px", "color": "#888"}),
+        ]),
+
         html.Div(style={"height": "16px"}),
 
-        dcc.Loading(
-            dcc.Graph(id="heatmap3d-graph",
-                      config={"toImageButtonOptions": {"format": "svg"}}),
-            type="dot"
-        ),
+        # Pas de dcc.Loading : l'aperçu puis les passes s'affichent au fil de l'eau
+        dcc.Graph(id="heatmap3d-graph",
+                  config={"toImageButtonOptions": {"format": "svg"}}),
+        # Descripteur de la grille multi-canal affichée (changement de canal sans calcul)
+        dcc.Store(id="hm-view"),
+        # Aperçu et trames de la tâche de fond, tagués par le n° de calcul (n_clicks)
+        dcc.Store(id="hm-preview"),
+        dcc.Store(id="hm-sweep", data={"sweep": 0}),
     ]
 )
 
@@ -121,10 +378,7 @@ def _show_m(v): return f"m = {v:.2f}"
 @callback(Output("hm-tend-val", "children"), Input("hm-tend", "value"))
 def _show_tend(v): return f"t_end = {v:.0f}"
 
-@callback(
-    Output("heatmap3d-graph", "figure"),
-    Output("hm-warn", "children"),
-    Input("btn-heatmap3d", "n_clicks"),
+GRID_STATES = [
     State("hm-m", "value"),
     State("hm-tend", "value"),
     State("hm-g-min", "value"),
@@ -133,31 +387,216 @@ def _show_tend(v): return f"t_end = {v:.0f}"
     State("hm-k-min", "value"),
     State("hm-k-max", "value"),
     State("hm-k-step", "value"),
+    State("hm-mode", "value"),
+    State("hm-channel", "value"),
+    State("hm-render", "value"),
+]
+
+
+@callback(
+    Output("hm-preview", "data"),
+    Input("btn-heatmap3d", "n_clicks"),
+    *GRID_STATES,
+    prevent_initial_call=True
+)
+def _preview_surface(n, m, t_end, gmin, gmax, gstep, kmin, kmax, kstep, mode, channel,
+                     render=None):
+    # Aperçu grossier (≤ PREVIEW_CELLS cellules) renvoyé immédiatement, avant
+    # que la tâche de fond n'affine la surface passe après passe ; affiché côté
+    # client seulement si aucune trame de ce calcul n'est arrivée avant lui
+    if _range_error(gmin, gmax, kmin, kmax):
+        raise PreventUpdate
+    gammas, ks = _grid_axes(gmin, gmax, gstep, kmin, kmax, kstep)
+    requested = len(gammas) * len(ks)
+    # Même budget que la tâche de fond : l'aperçu est la première passe de la
+    # grille planifiée ; grille refusée → le message vient de la tâche
+    try:
+        gammas, ks, _, _ = plan_grid(gammas, ks, t_points=800, mode=mode or "table",
+                                     backend=default_backend(), channels=True)
+    except BudgetExceeded:
+        raise PreventUpdate
+    s = _pass_strides(len(gammas), len(ks))[0]
+    g_sub, k_sub = strided_axis(gammas, s), strided_axis(ks, s)
+    Z = heatmap_channels(g_sub, k_sub, m=float(m), x0=1.0, v0=0.0, t_end=float(t_end),
+                         t_points=800, mode=mode or "table")
+    channel = channel or "max_amp"
+    render = _render_mode(render, requested)
+    traces = _grid_traces(g_sub, k_sub, Z[CHANNELS.index(channel)], channel, render)
+    fig = encode_figures("_preview_surface", _surface_figure(traces, channel, render, revision=n))[0]
+    return {"sweep": n, "figure": fig}
+
+
+# Rien n'ordonne la réponse de l'aperçu et les trames de la tâche de fond :
+# un aperçu en retard écraserait une passe déjà dessinée
+dash.clientside_callback(
+    """
+    function(preview, sweep) {
+        if (!preview || (sweep && sweep.sweep >= preview.sweep)) {
+            return window.dash_clientside.no_update;
+        }
+        return preview.figure;
+    }
+    """,
+    Output("heatmap3d-graph", "figure", allow_duplicate=True),
+    Input("hm-preview", "data"),
+    State("hm-sweep", "data"),
     prevent_initial_call=True
 )
-def _compute_surface(n, m, t_end, gmin, gmax, gstep, kmin, kmax, kstep):
-    gammas = np.arange(float(gmin), float(gmax) + 1e-12, float(gstep))
-    ks = np.arange(float(kmin), float(kmax) + 1e-12, float(kstep))
 
+
+@callback(
+    Output("heatmap3d-graph", "figure"),
+    Output("hm-warn", "children"),
+    Output("hm-view", "data"),
+    Output("last-heatmap", "data"),
+    Output("hm-sweep", "data"),
+    Input("btn-heatmap3d", "n_clicks"),
+    *GRID_STATES,
+    State("hm-adaptive", "value"),
+    background=True,
+    interval=250,
+    running=[
+        (Output("btn-heatmap3d", "disabled"), True, False),
+        (Output("hm-cancel", "disabled"), False, True),
+    ],
+    cancel=[Input("hm-cancel", "n_clicks")],
+    progress=[
+        Output("heatmap3d-graph", "figure"),
+        Output("hm-progress", "value"),
+        Output("hm-progress", "max"),
+        Output("hm-progress-text", "children"),
+        Output("hm-sweep", "data"),
+    ],
+    progress_default=[_empty_patch(), "0", "1", "", _empty_patch()],
+    prevent_initial_call=True
+)
+def _compute_surface(set_progress, n, m, t_end, gmin, gmax, gstep, kmin, kmax, kstep, mode,
+                     channel=None, render=None, adaptive=None):
+    deadline = time.monotonic() + sweep_deadline()
+    progress = _tag_frames(set_progress, n)
+    error = _range_error(gmin, gmax, kmin, kmax)
+    if error:
+        return dash.no_update, error, dash.no_update, dash.no_update, dash.no_update
+    gammas, ks = _grid_axes(gmin, gmax, gstep, kmin, kmax, kstep)
+
+    # Coût estimé avant calcul : grille allégée (ou refusée) au-delà du budget
+    requested = len(gammas) * len(ks)
+    render = _render_mode(render, requested)
+    try:
+        gammas, ks, stride, est = plan_grid(gammas, ks, t_points=800, mode=mode or "table",
+                                            backend=default_backend(), channels=True)
+    except BudgetExceeded as e:
+        return dash.no_update, str(e), dash.no_update, dash.no_update, dash.no_update
     cells = len(gammas) * len(ks)
-    warn = f"Résolution: {len(gammas)}×{len(ks)} = {cells} simulations."
-    # Sécurité soft pour VPS
-    if cells > 500:
-        warn += " (Attention: grille lourde, ça peut prendre du temps.)"
+    warn = f"Résolution: {len(gammas)}×{len(ks)} = {cells} simulations (~{est:.1f} s estimées)."
+    if stride > 1:
+        warn += f" Grille allégée (1 point sur {stride}, {requested} demandées) pour tenir le budget."
+    kwargs = dict(m=float(m), x0=1.0, v0=0.0, t_end=float(t_end), t_points=800,
+                  mode=mode or "table")
+    channel = channel or "max_amp"
+    c = CHANNELS.index(channel)
 
-    Z = heatmap_max_amp(gammas, ks, m=float(m), x0=1.0, v0=0.0, t_end=float(t_end), t_points=800)
+    if adaptive and len(gammas) > 2 and len(ks) > 2:
+        view = _adaptive_view(gammas, ks, float(m), float(t_end), mode or "table")
+        state = {"level": 0, "late": False}
 
-    # Surface 3D : axes = (k, gamma, Z)
-    K, G = np.meshgrid(ks, gammas)
-    fig = go.Figure(data=[go.Surface(x=K, y=G, z=Z, coloraxis="coloraxis", showscale=True)])
-    fig.update_layout(
-        title="Max |x(t)| en fonction de (γ, k) – surface 3D",
-        scene=dict(
-            xaxis_title="k",
-            yaxis_title="γ",
-            zaxis_title="max |x(t)|",
-        ),
-        coloraxis=dict(colorscale="Viridis"),
-        margin=dict(l=0, r=0, t=50, b=0)
-    )
-    return fig, warn
+        def on_level(level, total, evals):
+            progress((_empty_patch(), str(level), str(total),
+                      f"Niveau {level}/{total} – {evals} évaluations"))
+            # Échéance dépassée : raffinement arrêté au niveau atteint
+            state["level"], state["late"] = level, time.monotonic() > deadline
+            return state["late"]
+
+        G, K, Z = _adaptive_surface(view, channel, on_level)
+        evals = Z.shape[1]
+        warn += f" Adaptatif : {evals} évaluations ({cells / evals:.1f}× moins)."
+        if state["late"] and state["level"] < view["depth"]:
+            warn += f" Échéance atteinte : raffinement arrêté au niveau {state['level']}/{view['depth']}."
+        # Points et canaux déposés comme la grille uniforme : le changement de
+        # canal ne fait que relire les valeurs aux mêmes sommets
+        view["token"] = store_grid(G, K, Z, adaptive=True, **kwargs)
+        fig = _surface_figure([_mesh_trace(G, K, Z[c])], channel, revision=n)
+        return encode_figures("_compute_surface", fig)[0], warn, view, dash.no_update, {"sweep": n}
+
+    # Passes emboîtées (l'aperçu est la première) : les cellules d'une passe
+    # sont relues dans le TILE_STORE par les suivantes
+    computed_before = TILE_STORE.stats()["computed"]
+    strides = _pass_strides(len(gammas), len(ks))
+    for i, s in enumerate(strides[1:-1], start=2):
+        if time.monotonic() > deadline:
+            break
+        g_sub, k_sub = strided_axis(gammas, s), strided_axis(ks, s)
+        Z = heatmap_channels(g_sub, k_sub, **kwargs)
+        progress((_grid_patch(g_sub, k_sub, Z[c], channel, render), str(Z[c].size), str(cells),
+                  f"Passe {i}/{len(strides)} – {len(g_sub)}×{len(k_sub)}"))
+    Z, done = _sweep_with_progress(gammas, ks, progress, f"Passe {len(strides)}/{len(strides)}",
+                                   deadline=deadline, **kwargs)
+    fresh = TILE_STORE.stats()["computed"] - computed_before
+    # La tâche meurt avec son processus : cellules déposées dans le cache
+    # partagé, relues par les calculs suivants (autres tâches et workers)
+    TILE_STORE.flush()
+    if fresh < done:
+        warn += f" {fresh} cellules calculées, {done - fresh} servies par le cache ou l'atlas."
+    if done < cells:
+        warn += f" Échéance atteinte : grille partielle ({done}/{cells} cellules)."
+
+    # Grille multi-canal déposée dans le cache partagé : le changement de canal
+    # et l'export ZIP (autres processus) la relisent au lieu de relancer le balayage
+    token = store_grid(gammas, ks, Z, done=done, **kwargs)
+    view = {"token": token, "m": kwargs["m"], "t_end": kwargs["t_end"], "mode": kwargs["mode"],
+            "render": render}
+    fig = _surface_figure(_grid_traces(gammas, ks, Z[c], channel, render), channel, render,
+                          revision=n)
+    return encode_figures("_compute_surface", fig)[0], warn, view, view, {"sweep": n}
+
+
+@callback(
+    Output("heatmap3d-graph", "figure", allow_duplicate=True),
+    Input("hm-channel", "value"),
+    State("hm-view", "data"),
+    State("heatmap3d-graph", "relayoutData"),
+    prevent_initial_call=True
+)
+def _switch_channel(channel, view, relayout):
+    if not view or not channel:
+        raise PreventUpdate
+    render = view.get("render", "surface")
+    patch = dash.Patch()
+    stored = load_grid(view.get("token"))
+    if stored is None:
+        raise PreventUpdate
+    if view.get("adaptive"):
+        # Mêmes sommets (triangulation inchangée) : seules les valeurs changent
+        Z = _display(stored[2][CHANNELS.index(channel)])
+        patch["data"][0]["z"] = Z
+        patch["data"][0]["intensity"] = Z
+    elif render == "image":
+        patch = _image_patch(stored, channel, relayout)
+    else:
+        gammas, ks, Z = stored
+        Z = _display(Z[CHANNELS.index(channel)])
+        patch["data"][0]["z"] = downsample(gammas, ks, Z, SURFACE_MAX_SIDE)[2]
+    patch["layout"]["title"]["text"] = _surface_title(channel, render)
+    if render != "image":
+        patch["layout"]["scene"]["zaxis"]["title"]["text"] = CHANNEL_LABELS[channel]
+    return encode_patch(patch, "_switch_channel")
+
+
+@callback(
+    Output("heatmap3d-graph", "figure", allow_duplicate=True),
+    Input("heatmap3d-graph", "relayoutData"),
+    State("hm-view", "data"),
+    State("hm-channel", "value"),
+    prevent_initial_call=True
+)
+def _zoom_image(relayout, view, channel):
+    # Image 2D : chaque zoom re-rend la fenêtre visible à la résolution de
+    # l'écran (niveaux de détail à la demande)
+    if not view or view.get("render") != "image" or not relayout:
+        raise PreventUpdate
+    if not any(key.startswith(("xaxis.", "yaxis.")) for key in relayout):
+        raise PreventUpdate
+    stored = load_grid(view["token"])
+    if stored is None:
+        raise PreventUpdate
+    return encode_patch(_image_patch(stored, channel or "max_amp", relayout), "_zoom_image")
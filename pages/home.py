@@ -220,6 +220,8 @@ layout = html.Div(
             # Stores pour annotations et dessins
             dcc.Store(id="ts-annotations", data=[]),
             dcc.Store(id="ts-shapes", data=[]),
+            # Figures complètes déjà affichées : les mises à jour suivantes sont des Patch
+            dcc.Store(id="core-drawn"),
 
             # Liste des annotations textuelles
             html.Ul(id="annot-list", style={"fontSize": "0.8rem", "color": "#374151"}),
@@ -266,8 +268,9 @@ layout = html.Div(
                 id="opts",
                 options=[
                     {"label": "Afficher la grille", "value": "grid"},
+                    {"label": "Aperçu instantané des sliders", "value": "live"},
                 ],
-                value=[],
+                value=["live"],
                 inline=True,
             ),
         ]),
@@ -412,6 +415,21 @@ layout = html.Div(
                         "cursor": "pointer",
                     },
                 ),
+                html.Button(
+                    "Annuler",
+                    id="btn-export-zip-cancel",
+                    n_clicks=0,
+                    disabled=True,
+                    style={
+                        "padding": "6px 10px",
+                        "borderRadius": "4px",
+                        "border": "1px solid #ccc",
+                        "backgroundColor": "#ffffff",
+                        "cursor": "pointer",
+                    },
+                ),
+                html.Progress(id="zip-progress", value="0", max="6"),
+                html.Span(id="zip-progress-text", style={"color": "#888"}),
                 dcc.Store(id="export-done"),
                 dcc.Download(id="download-zip"),
                 dcc.Download(id="download-csv"),